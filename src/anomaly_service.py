@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from location_matrix import LocationMatrix
+
+ROLLING_WINDOW = 6
+MIN_PERIODS = 3
+Z_THRESHOLD = 2.0
+DROP_THRESHOLD_PCT = 50.0
+PERSISTENT_ZERO_MONTHS = 3
+
+
+@dataclass(frozen=True)
+class AnomalyTable:
+    """
+    Per-location anomaly signals for every month, all shaped (L, M) like the matrix.
+    - zero_streak: consecutive zero-revenue months ending at each month
+    - longest_zero_streak: (L,) longest zero run seen per location
+    - rolling_mean / rolling_std: trailing window stats over the months the location
+      reported (excluding the month itself)
+    - z_score: deviation of the month from its trailing window (NaN if not enough history)
+    - drop_pct: MoM decline in percent (positive numbers mean a drop; NaN unless the
+      location reported in both months)
+    - sudden_drop: drop >= threshold or z-score <= -threshold (reported months only)
+    Months a location is absent from are missing data, not zero revenue.
+    """
+    matrix: LocationMatrix
+    zero_streak: np.ndarray
+    longest_zero_streak: np.ndarray
+    rolling_mean: np.ndarray
+    rolling_std: np.ndarray
+    z_score: np.ndarray
+    drop_pct: np.ndarray
+    sudden_drop: np.ndarray
+
+    def summary(self, month: str) -> pd.DataFrame:
+        """
+        One row per location for the given month.
+        Returns columns: Location, Total, Zero Streak, Longest Zero Streak,
+        Z-Score, Drop %, Sudden Drop
+        """
+        j = self.matrix.month_pos(month)
+        return pd.DataFrame(
+            {
+                "Location": self.matrix.locations,
+                "Total": self.matrix.values["total"][:, j],
+                "Zero Streak": self.zero_streak[:, j],
+                "Longest Zero Streak": self.longest_zero_streak,
+                "Z-Score": self.z_score[:, j],
+                "Drop %": self.drop_pct[:, j],
+                "Sudden Drop": self.sudden_drop[:, j],
+            }
+        )
+
+    def persistent_zero_locations(self, month: str, min_months: int = PERSISTENT_ZERO_MONTHS) -> List[str]:
+        j = self.matrix.month_pos(month)
+        mask = self.zero_streak[:, j] >= min_months
+        return [str(x) for x in self.matrix.locations[mask]]
+
+    def sudden_drop_locations(self, month: str) -> List[str]:
+        j = self.matrix.month_pos(month)
+        return [str(x) for x in self.matrix.locations[self.sudden_drop[:, j]]]
+
+
+def _zero_streaks(zero: np.ndarray) -> np.ndarray:
+    # Distance to the last non-zero month, computed with a running maximum
+    n_month = zero.shape[1]
+    cols = np.broadcast_to(np.arange(n_month), zero.shape)
+    last_nonzero = np.maximum.accumulate(np.where(zero, -1, cols), axis=1)
+    return np.where(zero, cols - last_nonzero, 0)
+
+
+def _trailing_stats(values: np.ndarray, present: np.ndarray, window: int, min_periods: int):
+    # Prefix sums of x, x^2 and the reported-month count give every trailing window in O(1)
+    n_loc, n_month = values.shape
+    values = np.where(present, values, 0.0)
+    csum = np.zeros((n_loc, n_month + 1))
+    csq = np.zeros((n_loc, n_month + 1))
+    ccount = np.zeros((n_loc, n_month + 1))
+    np.cumsum(values, axis=1, out=csum[:, 1:])
+    np.cumsum(values * values, axis=1, out=csq[:, 1:])
+    np.cumsum(present, axis=1, out=ccount[:, 1:])
+
+    end = np.arange(n_month)                   # window is [start, end) -> excludes the month itself
+    start = np.maximum(end - window, 0)
+
+    s = csum[:, end] - csum[:, start]
+    sq = csq[:, end] - csq[:, start]
+    count = ccount[:, end] - ccount[:, start]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = s / count
+        var = np.maximum(sq / count - mean * mean, 0.0)
+    std = np.sqrt(var)
+
+    enough = count >= min_periods
+    mean[~enough] = np.nan
+    std[~enough] = np.nan
+    return mean, std
+
+
+def build_anomaly_table(
+    matrix: LocationMatrix,
+    window: int = ROLLING_WINDOW,
+    min_periods: int = MIN_PERIODS,
+    z_threshold: float = Z_THRESHOLD,
+    drop_threshold_pct: float = DROP_THRESHOLD_PCT,
+) -> AnomalyTable:
+    """
+    Detect zero-revenue streaks, rolling z-scores and sudden drops for every
+    location and month in one vectorised pass over the location matrix.
+    """
+    total = matrix.values["total"]
+    zero = matrix.present & (total == 0)
+
+    zero_streak = _zero_streaks(zero)
+    longest = zero_streak.max(axis=1) if zero_streak.size else np.zeros(len(matrix.locations), dtype=int)
+
+    present = matrix.present
+    mean, std = _trailing_stats(total, present, window, min_periods)
+    z_score = np.full(total.shape, np.nan)
+    np.divide(total - mean, std, out=z_score, where=present & (std > 0))
+
+    # MoM only between two reported months; an absent month is not a drop to 0
+    prev = np.zeros_like(total)
+    prev[:, 1:] = total[:, :-1]
+    both = np.zeros_like(present)
+    both[:, 1:] = present[:, 1:] & present[:, :-1]
+    drop_pct = np.where(both, 0.0, np.nan)
+    np.divide((prev - total) * 100.0, prev, out=drop_pct, where=both & (prev > 0))
+
+    sudden_drop = (np.nan_to_num(drop_pct) >= drop_threshold_pct) | (np.nan_to_num(z_score) <= -z_threshold)
+
+    return AnomalyTable(
+        matrix=matrix,
+        zero_streak=zero_streak,
+        longest_zero_streak=longest,
+        rolling_mean=mean,
+        rolling_std=std,
+        z_score=z_score,
+        drop_pct=drop_pct,
+        sudden_drop=sudden_drop,
+    )
@@ -0,0 +1,144 @@
+"""
+Load test for the local JSON API (api_server.py).
+
+Usage:
+  python api_loadtest.py --seconds 10 --clients 8
+  python api_loadtest.py --url http://127.0.0.1:8600 --conditional
+
+Starts an in-process server unless --url is given, then has `clients` threads issue
+GET requests over keep-alive connections for `seconds`, cycling through the endpoints.
+Reports sustained requests/sec and latency percentiles. --conditional sends
+If-None-Match with the ETag from a first response (measuring the 304 path).
+"""
+import argparse
+import http.client
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import quote, urlsplit
+
+import numpy as np
+
+from config import PRIMARY_EXCEL
+
+ENDPOINTS = [
+    "/api/kpis",
+    "/api/trend?window=Trailing%203",
+    "/api/top?n=10",
+    "/api/top?n=10&order=asc&stream=data",
+    "/api/months",
+    "/api/locations",
+]
+
+
+def _client(host: str, port: int, paths: List[str], deadline: float, etag: Optional[str],
+            latencies: list, statuses: Dict[int, int], lock: threading.Lock) -> None:
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {"If-None-Match": etag} if etag else {}
+    local = []
+    local_status: Dict[int, int] = {}
+    i = 0
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        conn.request("GET", paths[i % len(paths)], headers=headers)
+        resp = conn.getresponse()
+        resp.read()
+        local.append(time.perf_counter() - t0)
+        local_status[resp.status] = local_status.get(resp.status, 0) + 1
+        i += 1
+    conn.close()
+    with lock:
+        latencies.extend(local)
+        for status, count in local_status.items():
+            statuses[status] = statuses.get(status, 0) + count
+
+
+def run_load_test(host: str, port: int, seconds: float = 10.0, clients: int = 8,
+                  conditional: bool = False, paths: Optional[List[str]] = None) -> dict:
+    paths = list(paths or ENDPOINTS)
+
+    # Warm the model and response caches, and pick up the ETag
+    conn = http.client.HTTPConnection(host, port, timeout=300)
+    etag = None
+    for path in paths:
+        conn.request("GET", path)
+        resp = conn.getresponse()
+        resp.read()
+        etag = resp.getheader("ETag") or etag
+    conn.close()
+
+    latencies: list = []
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(
+            target=_client,
+            args=(host, port, paths, deadline, etag if conditional else None, latencies, statuses, lock),
+        )
+        for _ in range(clients)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    ms = np.array(latencies) * 1000
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "requests_per_sec": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": float(np.percentile(ms, 50)) if len(ms) else 0.0,
+        "p95_ms": float(np.percentile(ms, 95)) if len(ms) else 0.0,
+        "p99_ms": float(np.percentile(ms, 99)) if len(ms) else 0.0,
+        "statuses": statuses,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test the SINBIP JSON API.")
+    parser.add_argument("--url", help="Running server (default: start one in-process on a free port)")
+    parser.add_argument("--workbook", type=Path, default=PRIMARY_EXCEL)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--conditional", action="store_true", help="Send If-None-Match (304 path)")
+    parser.add_argument("--location-series", action="store_true", help="Also query every location's series")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        from api_server import make_server
+
+        server = make_server("127.0.0.1", 0, args.workbook)
+        host, port = server.server_address[:2]
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    paths = list(ENDPOINTS)
+    if args.location_series:
+        from model_store import get_model
+
+        model = get_model(args.workbook)
+        paths += [f"/api/locations/{quote(str(loc), safe='')}/series" for loc in model["matrix"].locations]
+
+    try:
+        result = run_load_test(host, port, args.seconds, args.clients, args.conditional, paths)
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    print(f"{result['requests']} requests in {result['seconds']:.1f}s with {result['clients']} clients")
+    print(f"  {result['requests_per_sec']:.0f} req/s  p50 {result['p50_ms']:.2f} ms  "
+          f"p95 {result['p95_ms']:.2f} ms  p99 {result['p99_ms']:.2f} ms")
+    print(f"  statuses: {result['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
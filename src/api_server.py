@@ -0,0 +1,272 @@
+"""
+Local JSON API over the shared dashboard model (stdlib only).
+
+Usage:
+  python api_server.py --port 8600
+
+Endpoints (GET):
+  /api/health
+  /api/months
+  /api/kpis?month=jan_26                    KPI summary (default: latest month)
+  /api/trend?window=Trailing 3&stream=total network series per month
+  /api/top?month=jan_26&n=10&window=1&stream=total&order=desc
+  /api/locations                            location names
+  /api/locations/<name>/series?stream=total per-location monthly series
+
+Responses carry an ETag derived from the workbook content hash and code version;
+requests with a matching If-None-Match get 304 Not Modified. Encoded bodies are
+memoized per (ETag, URL), so repeated queries skip both computation and JSON encoding.
+"""
+import argparse
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from config import API_HOST, API_PORT, PRIMARY_EXCEL
+from kpi_service import WINDOWS
+from location_matrix import STREAMS
+from model_store import get_model
+from result_cache import code_version, file_sha256
+
+_RESPONSE_CACHE_SIZE = 512
+_PATHS = {"/api/health", "/api/months", "/api/kpis", "/api/trend", "/api/top", "/api/locations"}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, pd.DataFrame):
+        return value.to_dict(orient="records")
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    raise TypeError(f"Not JSON serialisable: {type(value).__name__}")
+
+
+def _param(query: Dict[str, list], name: str, default: Optional[str] = None) -> Optional[str]:
+    values = query.get(name)
+    return values[0] if values else default
+
+
+def _window(query: Dict[str, list]):
+    raw = _param(query, "window", "1")
+    if raw in WINDOWS:
+        return WINDOWS[raw]
+    if raw == "ytd":
+        return raw
+    try:
+        window = int(raw)
+    except ValueError:
+        raise ApiError(400, f"Unknown window: {raw}")
+    if window < 1:
+        raise ApiError(400, "window must be >= 1")
+    return window
+
+
+def _stream(query: Dict[str, list]) -> str:
+    stream = _param(query, "stream", "total")
+    if stream not in STREAMS:
+        raise ApiError(400, f"Unknown stream: {stream} (expected one of {', '.join(STREAMS)})")
+    return stream
+
+
+def _month(model: dict, query: Dict[str, list]) -> str:
+    month = _param(query, "month", model["latest_name"])
+    if month not in model["calendar"]:
+        raise ApiError(404, f"Unknown month: {month}")
+    return month
+
+
+class KpiApi:
+    """Routes a parsed request to a JSON-ready payload computed from the cached model."""
+
+    def __init__(self, workbook: Path = PRIMARY_EXCEL):
+        self.workbook = Path(workbook)
+        self._lock = threading.Lock()
+        self._responses: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+
+    def etag(self) -> str:
+        try:
+            return f'"{file_sha256(self.workbook)[:16]}-{code_version()[:8]}"'
+        except OSError as e:
+            raise ApiError(500, f"Failed to load workbook: {e}")
+
+    def model(self) -> dict:
+        try:
+            model = get_model(self.workbook)
+        except Exception as e:
+            raise ApiError(500, f"Failed to load workbook: {e}")
+        if model is None:
+            raise ApiError(503, "No monthly sheets found in the workbook.")
+        return model
+
+    def cached(self, etag: str, url: str) -> bool:
+        """True if url was already answered for this etag (so it resolves and its parameters are valid)."""
+        with self._lock:
+            return (etag, url) in self._responses
+
+    def respond(self, url: str) -> Tuple[str, bytes]:
+        """(etag, encoded JSON body) for a GET url; raises ApiError."""
+        etag = self.etag()
+        key = (etag, url)
+        with self._lock:
+            body = self._responses.get(key)
+            if body is not None:
+                self._responses.move_to_end(key)
+                return etag, body
+
+        parts = urlsplit(url)
+        payload = self.route(parts.path.rstrip("/") or "/", parse_qs(parts.query))
+        body = json.dumps(payload, default=_jsonable).encode("utf-8")
+        with self._lock:
+            self._responses[key] = body
+            while len(self._responses) > _RESPONSE_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return etag, body
+
+    def route(self, path: str, query: Dict[str, list]) -> Any:
+        if path not in _PATHS and not (path.startswith("/api/locations/") and path.endswith("/series")):
+            raise ApiError(404, f"Unknown endpoint: {path}")
+        if path == "/api/health":
+            return {"status": "ok", "workbook": self.workbook.name}
+
+        model = self.model()
+        calendar = model["calendar"]
+
+        if path == "/api/months":
+            return [
+                {"month": name, "label": calendar.label(name), "period": calendar.period(name)}
+                for name in calendar.names
+            ]
+
+        if path == "/api/kpis":
+            month = _month(model, query)
+            return {"month": month, **model["kpis_by_month"][month]}
+
+        if path == "/api/trend":
+            window, stream = _window(query), _stream(query)
+            return {
+                "months": calendar.names,
+                "labels": [calendar.label(m) for m in calendar.names],
+                "values": model["windows"].series(window, stream),
+            }
+
+        if path == "/api/top":
+            month, window, stream = _month(model, query), _window(query), _stream(query)
+            try:
+                n = int(_param(query, "n", "10"))
+            except ValueError:
+                raise ApiError(400, "n must be an integer")
+            # Locations absent from the window are not ranked (they would fill the bottom as 0)
+            totals = model["windows"].location_totals(month, window, stream, reporting_only=True)
+            ranked = totals.nsmallest(n) if _param(query, "order", "desc") == "asc" else totals.nlargest(n)
+            return {
+                "month": month,
+                "stream": stream,
+                "locations": [{"Location": loc, "value": float(v)} for loc, v in ranked.items()],
+            }
+
+        if path == "/api/locations":
+            return model["matrix"].locations.tolist()
+
+        if path.startswith("/api/locations/") and path.endswith("/series"):
+            name = unquote(path[len("/api/locations/"):-len("/series")])
+            matrix = model["matrix"]
+            if name not in matrix.locations:
+                raise ApiError(404, f"Unknown location: {name}")
+            row = matrix.locations.get_loc(name)
+            stream = _stream(query)
+            values = matrix.values[stream][row]
+            present = matrix.present[row]
+            return {
+                "location": name,
+                "stream": stream,
+                "months": matrix.months,
+                "values": [float(v) if p else None for v, p in zip(values, present)],
+            }
+
+
+def make_handler(api: KpiApi):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body are separate writes; without TCP_NODELAY keep-alive clients stall on delayed ACKs
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            try:
+                etag = api.etag()
+                # 304 only for a URL that resolves: one already answered for this ETag skips the
+                # model entirely, anything else is routed and validated first (404 / 400 win)
+                if self.headers.get("If-None-Match") == etag and api.cached(etag, self.path):
+                    self._send(304, b"", etag)
+                    return
+                etag, body = api.respond(self.path)
+            except ApiError as e:
+                self._send(e.status, json.dumps({"error": str(e)}).encode("utf-8"))
+                return
+            except Exception as e:
+                self._send(500, json.dumps({"error": f"Internal error: {type(e).__name__}: {e}"}).encode("utf-8"))
+                return
+            if self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", etag)
+                return
+            self._send(200, body, etag)
+
+        def _send(self, status: int, body: bytes, etag: Optional[str] = None) -> None:
+            self.send_response(status)
+            if etag:
+                self.send_header("ETag", etag)
+                self.send_header("Cache-Control", "no-cache")
+            if status != 304:
+                self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def make_server(host: str = API_HOST, port: int = API_PORT, workbook: Path = PRIMARY_EXCEL) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), make_handler(KpiApi(workbook)))
+    server.daemon_threads = True
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve SINBIP KPIs as JSON on localhost.")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workbook", type=Path, default=PRIMARY_EXCEL)
+    args = parser.parse_args()
+
+    server = make_server(args.host, args.port, args.workbook)
+    print(f"Serving {args.workbook.name} on http://{args.host}:{server.server_address[1]}/api/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
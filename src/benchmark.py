@@ -0,0 +1,147 @@
+"""
+Headless benchmark for the loader / KPI pipeline.
+
+Usage:
+  python benchmark.py --locations 1000 --months 36
+  python benchmark.py --workbook ../data/SINBIP_MONTHLY_REPORT_UPDATED.xlsx
+  python benchmark.py --json results.json --baseline previous.json --tolerance 0.25
+  python benchmark.py --compare-engines --locations 2000
+
+Reports wall time and peak Python memory (tracemalloc, separate pass) per stage. With
+--baseline, exits non-zero when any stage is slower than baseline * (1 + tolerance).
+"""
+import argparse
+import gc
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from data_loader import load_all_months, load_sheet22
+from kpi_service import calculate_kpis, build_trend_series
+from sheet22_service import build_sheet22_context
+from sparkline import build_location_trend_frame
+from synthetic_workbook import generate_workbook
+from utils import build_calendar_index
+
+
+def _latest(ctx: dict):
+    return ctx["months"][build_calendar_index(ctx["months"]).latest]
+
+
+# Each stage reads what it needs from ctx and returns a value stored under its name.
+STAGES: List[tuple[str, Callable[[dict], Any]]] = [
+    ("load_all_months", lambda ctx: load_all_months(ctx["path"])),
+    ("calculate_kpis", lambda ctx: calculate_kpis(_latest(ctx))),
+    ("build_trend_series", lambda ctx: build_trend_series(ctx["months"])),
+    ("load_sheet22", lambda ctx: load_sheet22(ctx["path"])),
+    ("build_sheet22_context", lambda ctx: build_sheet22_context(ctx["sheet22"])),
+    ("build_location_trend_frame", lambda ctx: build_location_trend_frame(ctx["sheet22"])),
+]
+
+# Month sheet readers side by side (--compare-engines)
+ENGINE_STAGES: List[tuple[str, Callable[[dict], Any]]] = [
+    ("load_all_months[pandas]", lambda ctx: load_all_months(ctx["path"], engine="pandas")),
+    ("load_all_months[stream]", lambda ctx: load_all_months(ctx["path"], engine="stream")),
+]
+
+# Where a stage's result is stored for later stages
+_OUTPUT_KEYS = {"load_all_months": "months", "load_sheet22": "sheet22"}
+
+
+def measure(fn: Callable[[], Any], repeat: int = 1, trace_memory: bool = True) -> tuple[Any, Dict[str, float]]:
+    """
+    Best wall time over `repeat` untraced runs, plus peak traced memory from
+    one extra tracemalloc run (tracing slows code down, so it is never timed).
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+
+    peak = 0
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, {"seconds": best, "peak_mb": peak / 1e6}
+
+
+def run_benchmark(
+    path: Path,
+    repeat: int = 1,
+    stages: List[tuple] | None = None,
+    trace_memory: bool = True,
+) -> Dict[str, Dict[str, float]]:
+    ctx: Dict[str, Any] = {"path": Path(path)}
+    results = {}
+    for name, fn in stages or STAGES:
+        value, stats = measure(lambda: fn(ctx), repeat, trace_memory)
+        ctx[_OUTPUT_KEYS.get(name, name)] = value
+        results[name] = stats
+    return results
+
+
+def find_regressions(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    out = []
+    for name, stats in results.items():
+        ref = baseline.get(name)
+        if ref and stats["seconds"] > ref["seconds"] * (1 + tolerance):
+            out.append(f"{name}: {stats['seconds']:.3f}s vs baseline {ref['seconds']:.3f}s")
+    return out
+
+
+def print_results(results: dict, title: str) -> None:
+    print(title)
+    print(f"{'stage':<32}{'seconds':>10}{'peak MB':>10}")
+    for name, stats in results.items():
+        print(f"{name:<32}{stats['seconds']:>10.3f}{stats['peak_mb']:>10.1f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SINBIP loading and KPI stages.")
+    parser.add_argument("--workbook", type=Path, help="Existing workbook (default: generate a synthetic one)")
+    parser.add_argument("--locations", type=int, default=500)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--compare-engines", action="store_true", help="Only benchmark the pandas vs streaming readers")
+    parser.add_argument("--json", type=Path, help="Write results as JSON")
+    parser.add_argument("--baseline", type=Path, help="Compare against a previous --json output")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.workbook:
+            path = args.workbook
+            title = f"Workbook: {path}"
+        else:
+            path = generate_workbook(Path(tmp) / "synthetic.xlsx", locations=args.locations, months=args.months)
+            title = f"Synthetic workbook: {args.locations} locations x {args.months} months"
+        stages = ENGINE_STAGES if args.compare_engines else STAGES
+        results = run_benchmark(path, repeat=args.repeat, stages=stages, trace_memory=not args.no_memory)
+
+    print_results(results, title)
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2))
+
+    if args.baseline:
+        regressions = find_regressions(results, json.loads(args.baseline.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""
+Per-location board packs: one PDF page per NBIP site.
+
+Usage:
+  python board_packs.py                          # one file per site under exports/board_packs
+  python board_packs.py --merged --workers 4     # every site in one document
+  python board_packs.py --locations 2000 --months 36 --merged
+
+Each site's series are read from the cached model (the location matrix and its
+window prefix sums), never re-derived from the workbook. Pages are built across a
+process pool in chunks of sites and streamed to the output in location order;
+pages/sec is reported. With one file per site the workers also write the files.
+For the merged document the workers build the page contents and this process
+draws them into a single canvas (no PDF merge step is needed).
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfgen.canvas import Canvas
+
+from config import APP_TITLE, EXPORT_DIR, PRIMARY_EXCEL
+from location_matrix import STREAMS
+from model_store import get_model
+from utils import fmt_currency, fmt_pct
+
+PACK_DIR = EXPORT_DIR / "board_packs"
+TABLE_MONTHS = 12
+_MARGIN = 40
+_ACCENT = colors.HexColor("#4b9bb1")
+_LINE = colors.HexColor("#7bd6d1")
+
+
+@dataclass(frozen=True)
+class LocationStore:
+    """
+    Per-location series for the packs, as views of the cached model (no copies).
+    - locations: site names (row axis); months / labels: sheet names and display labels (chronological)
+    - values: {stream: (L, M)}; present: (L, M)
+    - prefix: {stream: (L, M + 1)} cumulative sums; year_start / t12_start: (M,) window starts
+    - rank: (L,) 1-based rank by latest-month total; network_latest: latest network total
+    - yoy_pos: position of the same month last year, or -1
+    """
+    locations: np.ndarray
+    months: List[str]
+    labels: List[str]
+    values: Dict[str, np.ndarray] = field(default_factory=dict)
+    present: np.ndarray = field(default_factory=lambda: np.zeros((0, 0), dtype=bool))
+    prefix: Dict[str, np.ndarray] = field(default_factory=dict)
+    year_start: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    t12_start: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    rank: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    network_latest: float = 0.0
+    yoy_pos: int = -1
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+    @property
+    def latest_name(self) -> str:
+        return self.months[-1]
+
+
+def build_location_store(model: Dict[str, Any]) -> LocationStore:
+    matrix = model["matrix"]
+    windows = model["windows"]
+    calendar = model["calendar"]
+    latest = matrix.values["total"][:, -1]
+    rank = np.empty(len(latest), dtype=np.int64)
+    rank[np.argsort(-latest, kind="stable")] = np.arange(1, len(latest) + 1)
+    yoy = calendar.same_month_last_year(matrix.months[-1])
+    return LocationStore(
+        locations=matrix.locations.to_numpy(),
+        months=list(matrix.months),
+        labels=[calendar.label(m) for m in matrix.months],
+        values=matrix.values,
+        present=matrix.present,
+        prefix=windows.prefix,
+        year_start=windows.year_start,
+        t12_start=windows.window_starts(12),
+        rank=rank,
+        network_latest=float(latest.sum()),
+        yoy_pos=matrix.month_pos(yoy) if yoy in matrix.months else -1,
+    )
+
+
+def pack_filenames(store: LocationStore) -> List[str]:
+    """One file name per site (unsafe characters replaced; clashes numbered)."""
+    seen: Dict[str, int] = {}
+    names = []
+    for location in store.locations:
+        stem = re.sub(r"[^A-Za-z0-9._-]+", "_", str(location)).strip("_") or "location"
+        seen[stem] = seen.get(stem, 0) + 1
+        if seen[stem] > 1:
+            stem = f"{stem}_{seen[stem]}"
+        names.append(f"{stem}_{store.latest_name}.pdf")
+    return names
+
+
+def _change(current: float, base: Optional[float]) -> str:
+    if base is None or not base:
+        return "n/a"
+    return f"{fmt_currency(current - base)} ({fmt_pct((current - base) / base * 100.0)})"
+
+
+def location_page(store: LocationStore, row: int, title: str = APP_TITLE) -> Dict[str, Any]:
+    """Everything drawn on one site's page: formatted text plus chart points in page coordinates."""
+    n = len(store.months)
+    last = n - 1
+    totals = store.values["total"][row]
+    latest = float(totals[last])
+    prefix = store.prefix["total"][row]
+    mix = [float(store.values[s][row][last]) / latest * 100.0 if latest else 0.0 for s in ("voice", "sms", "data")]
+
+    kpis = [
+        (f"Revenue ({store.labels[last]})", fmt_currency(latest)),
+        ("MoM Change", _change(latest, float(totals[last - 1]) if n > 1 else None)),
+        ("YoY Change", _change(latest, float(totals[store.yoy_pos]) if store.yoy_pos >= 0 else None)),
+        ("Trailing 12 Months", fmt_currency(float(prefix[n] - prefix[store.t12_start[last]]))),
+        ("Year to Date", fmt_currency(float(prefix[n] - prefix[store.year_start[last]]))),
+        ("Share of Network", fmt_pct(latest / store.network_latest * 100.0 if store.network_latest else 0.0)),
+        ("Network Rank", f"{store.rank[row]:,} of {len(store):,}"),
+        ("Revenue Mix", f"Voice {mix[0]:.0f}% / SMS {mix[1]:.0f}% / Data {mix[2]:.0f}%"),
+        ("Months Reported", f"{int(store.present[row].sum())} of {n}"),
+    ]
+
+    # Trend chart box: x from _MARGIN to width - _MARGIN, y from 380 to 570
+    width = A4[0] - 2 * _MARGIN
+    top = float(totals.max()) if n else 0.0
+    scale = 180.0 / top if top > 0 else 0.0
+    step = width / max(n - 1, 1)
+    points = [(_MARGIN + j * step, 385.0 + float(v) * scale) for j, v in enumerate(totals)]
+
+    table = []
+    for j in range(last, max(last - TABLE_MONTHS, -1), -1):
+        if store.present[row][j]:
+            table.append([store.labels[j]] + [fmt_currency(float(store.values[s][row][j])) for s in STREAMS])
+        else:
+            table.append([store.labels[j], "-", "-", "-", "-"])
+
+    return {
+        "title": str(store.locations[row]),
+        "subtitle": f"{title} - Site Board Pack - {store.labels[last]}",
+        "kpis": kpis,
+        "points": points,
+        "y_max": fmt_currency(top),
+        "x_labels": (store.labels[0], store.labels[last]),
+        "table": table,
+    }
+
+
+def draw_page(c: Canvas, page: Dict[str, Any]) -> None:
+    """Draw one prepared page and close it."""
+    width, height = A4
+    c.setFillColor(_ACCENT)
+    c.rect(0, height - 24, width, 24, stroke=0, fill=1)
+    c.setFillColor(colors.black)
+    c.setFont("Helvetica-Bold", 18)
+    c.drawString(_MARGIN, height - 58, page["title"])
+    c.setFont("Helvetica", 10)
+    c.drawString(_MARGIN, height - 74, page["subtitle"])
+
+    y = height - 104
+    for label, value in page["kpis"]:
+        c.setFont("Helvetica-Bold", 10)
+        c.drawString(_MARGIN, y, label)
+        c.setFont("Helvetica", 10)
+        c.drawString(_MARGIN + 150, y, value)
+        y -= 16
+
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(_MARGIN, 580, "Total Revenue Trend")
+    c.setStrokeColor(colors.grey)
+    c.setLineWidth(0.5)
+    c.line(_MARGIN, 380, width - _MARGIN, 380)
+    c.line(_MARGIN, 380, _MARGIN, 570)
+    points = page["points"]
+    if len(points) > 1:
+        path = c.beginPath()
+        path.moveTo(*points[0])
+        for x, y in points[1:]:
+            path.lineTo(x, y)
+        c.setStrokeColor(_LINE)
+        c.setLineWidth(1.5)
+        c.drawPath(path, stroke=1, fill=0)
+    c.setFont("Helvetica", 8)
+    c.drawString(_MARGIN + 4, 562, page["y_max"])
+    c.drawString(_MARGIN, 368, page["x_labels"][0])
+    c.drawRightString(width - _MARGIN, 368, page["x_labels"][1])
+
+    c.setFont("Helvetica-Bold", 12)
+    c.drawString(_MARGIN, 336, f"Last {TABLE_MONTHS} Months")
+    columns = [_MARGIN + 80, _MARGIN + 190, _MARGIN + 290, _MARGIN + 390, width - _MARGIN]
+    y = 316
+    c.setFont("Helvetica-Bold", 9)
+    c.drawString(_MARGIN, y, "Month")
+    for x, header in zip(columns, ("Total", "Voice", "SMS", "Data")):
+        c.drawRightString(x + 60, y, header)
+    c.setFont("Helvetica", 9)
+    for cells in page["table"]:
+        y -= 15
+        c.drawString(_MARGIN, y, cells[0])
+        for x, cell in zip(columns, cells[1:]):
+            c.drawRightString(x + 60, y, cell)
+    c.showPage()
+
+
+# Per-process worker state; a forked worker inherits the parent's, a spawned one loads the cached model
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(workbook: str, title: str) -> None:
+    if _WORKER.get("workbook") != workbook:
+        model = get_model(Path(workbook))
+        if model is None or not model["matrix"].months:
+            raise ValueError(f"No monthly sheets found in {Path(workbook).name}")
+        store = build_location_store(model)
+        _WORKER.update(workbook=workbook, title=title, store=store, filenames=pack_filenames(store))
+
+
+def _page_chunk(rows: range) -> List[Dict[str, Any]]:
+    return [location_page(_WORKER["store"], row, _WORKER["title"]) for row in rows]
+
+
+def _write_chunk(job: tuple) -> int:
+    rows, out_dir = job
+    filenames = _WORKER["filenames"]
+    for row, page in zip(rows, _page_chunk(rows)):
+        c = Canvas(str(Path(out_dir) / filenames[row]), pagesize=A4)
+        draw_page(c, page)
+        c.save()
+    return len(rows)
+
+
+def _results(fn, jobs: list, workers: int) -> Iterator:
+    # Ordered, streamed as chunks finish; a single worker runs in-process
+    if workers <= 1:
+        yield from map(fn, jobs)
+        return
+    args = (_WORKER["workbook"], _WORKER["title"])
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=args) as pool:
+        yield from pool.map(fn, jobs)
+
+
+def generate_board_packs(
+    workbook: Path = PRIMARY_EXCEL,
+    out: Optional[Path] = None,
+    merged: bool = False,
+    workers: Optional[int] = None,
+    chunk: int = 64,
+    limit: Optional[int] = None,
+    title: str = APP_TITLE,
+) -> Dict[str, Any]:
+    """
+    Render a page per site. `out` is a directory (one file per site, default exports/board_packs)
+    or, with merged=True, the document path. Returns pages, seconds, pages/sec and the output path.
+    Raises ValueError if the workbook has no month sheets.
+    """
+    t0 = time.perf_counter()
+    _init_worker(str(workbook), title)
+    store = _WORKER["store"]
+    workers = workers or os.cpu_count() or 1
+    total = len(store) if limit is None else min(limit, len(store))
+    chunks = [range(i, min(i + chunk, total)) for i in range(0, total, chunk)]
+
+    pages = 0
+    if merged:
+        out = Path(out or EXPORT_DIR / f"SINBIP_Location_Packs_{store.latest_name}.pdf")
+        out.parent.mkdir(parents=True, exist_ok=True)
+        c = Canvas(str(out), pagesize=A4)
+        c.setTitle(f"{title} - Site Board Packs - {store.labels[-1]}")
+        for chunk_pages in _results(_page_chunk, chunks, workers):
+            for page in chunk_pages:
+                draw_page(c, page)
+            pages += len(chunk_pages)
+        c.save()
+    else:
+        out = Path(out or PACK_DIR)
+        out.mkdir(parents=True, exist_ok=True)
+        pages = sum(_results(_write_chunk, [(rows, str(out)) for rows in chunks], workers))
+
+    seconds = time.perf_counter() - t0
+    return {
+        "pages": pages,
+        "seconds": seconds,
+        "pages_per_sec": pages / seconds if seconds else 0.0,
+        "workers": workers,
+        "output": out,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Render a one-page board pack per SINBIP location.")
+    parser.add_argument("--workbook", type=Path)
+    parser.add_argument("--out", type=Path, help="Output directory, or the document path with --merged")
+    parser.add_argument("--merged", action="store_true", help="Write every site into one document")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk", type=int, default=64, help="Sites per worker task")
+    parser.add_argument("--limit", type=int, help="Only the first N sites")
+    parser.add_argument("--locations", type=int, help="Use a synthetic workbook with this many locations")
+    parser.add_argument("--months", type=int, default=24)
+    args = parser.parse_args()
+
+    workbook = args.workbook or PRIMARY_EXCEL
+    if args.locations:
+        from synthetic_workbook import generate_workbook
+
+        workbook = Path(tempfile.mkdtemp(prefix="sinbip_packs_")) / "synthetic.xlsx"
+        generate_workbook(workbook, locations=args.locations, months=args.months)
+
+    try:
+        r = generate_board_packs(workbook, out=args.out, merged=args.merged, workers=args.workers,
+                                 chunk=args.chunk, limit=args.limit)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    print(f"{r['pages']} pages in {r['seconds']:.1f}s ({r['pages_per_sec']:.1f} pages/s, "
+          f"{r['workers']} workers) -> {r['output']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,25 @@
 from pathlib import Path
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+
+def _load_env_file() -> None:
+    # Same search as dotenv's find_dotenv (this folder, then its parents); python-dotenv
+    # is only imported when there is a .env to read
+    here = Path(__file__).resolve().parent
+    for folder in (here, *here.parents):
+        if (folder / ".env").is_file():
+            from dotenv import load_dotenv
+
+            load_dotenv(folder / ".env")
+            return
+
+
+_load_env_file()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATA_DIR = BASE_DIR / "data"
 MONTHLY_DIR = DATA_DIR / "monthly"
-EXPORT_DIR = BASE_DIR / "exports"
-
-EXPORT_DIR.mkdir(exist_ok=True, parents=True)
+EXPORT_DIR = BASE_DIR / "exports"  # created on first export (warmup.cached_board_pdf)
 
 # Primary monthly Excel file (single snapshot)
 PRIMARY_EXCEL = Path(os.getenv("SINBIP_PRIMARY_EXCEL", str(DATA_DIR / "SINBIP_MONTHLY_REPORT_UPDATED.xlsx")))
@@ -17,9 +27,39 @@ PRIMARY_EXCEL = Path(os.getenv("SINBIP_PRIMARY_EXCEL", str(DATA_DIR / "SINBIP_MO
 # Main revenue sheet: by default first sheet (0). You can override if needed.
 MAIN_SHEET_NAME = os.getenv("SINBIP_MAIN_SHEET_NAME", "").strip() or None  # None => first sheet
 
+# Month sheet reader: "stream" (openpyxl read-only, values only) or "pandas" (pd.read_excel)
+LOADER_ENGINE = os.getenv("SINBIP_LOADER_ENGINE", "stream").strip().lower()
+
 # Sheet22 fixed name in the user's dataset
 SHEET22_NAME = os.getenv("SINBIP_SHEET22_NAME", "Sheet22")
 
+# Calendar month of Sheet22's first month column (e.g. mar_24); inferred from the month sheets if unset
+SHEET22_START_MONTH = os.getenv("SINBIP_SHEET22_START_MONTH", "").strip() or None
+
+# Optional location -> region mapping: a workbook sheet or a CSV (columns: Location, Region/Province)
+REGION_SHEET_NAME = os.getenv("SINBIP_REGION_SHEET_NAME", "Regions")
+REGION_CSV = Path(os.getenv("SINBIP_REGION_CSV")) if os.getenv("SINBIP_REGION_CSV") else None
+
+# Stage timing diagnostics: optional JSON-lines log file and tracemalloc-based memory deltas
+DIAGNOSTICS_LOG = Path(os.getenv("SINBIP_DIAGNOSTICS_LOG")) if os.getenv("SINBIP_DIAGNOSTICS_LOG") else None
+DIAGNOSTICS_MEMORY = os.getenv("SINBIP_DIAGNOSTICS_MEMORY", "").strip().lower() in {"1", "true", "yes"}
+
+# Persistent model cache (SQLite under exports/cache by default), bounded by size with LRU eviction
+DISK_CACHE = os.getenv("SINBIP_DISK_CACHE", "1").strip().lower() not in {"0", "false", "no"}
+CACHE_DIR = Path(os.getenv("SINBIP_CACHE_DIR", str(EXPORT_DIR / "cache")))
+CACHE_MAX_MB = float(os.getenv("SINBIP_CACHE_MAX_MB", "512"))
+
+# Cross-process shared model: a memory-mapped Arrow IPC file under CACHE_DIR/arrow that every
+# server process on the host maps read-only (takes precedence over the SQLite model cache)
+SHARED_MODEL = os.getenv("SINBIP_SHARED_MODEL", "").strip().lower() in {"1", "true", "yes"}
+
+# Board PDF: append a table of every location for the latest month
+BOARD_PDF_APPENDIX = os.getenv("SINBIP_BOARD_PDF_APPENDIX", "").strip().lower() in {"1", "true", "yes"}
+
+# Local JSON API (api_server.py)
+API_HOST = os.getenv("SINBIP_API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("SINBIP_API_PORT", "8600"))
+
 # Auth settings (replace in production)
 BOARD_USER = os.getenv("SINBIP_BOARD_USER", "board")
 BOARD_PASS = os.getenv("SINBIP_BOARD_PASS", "b0@rd!#$")
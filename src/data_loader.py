@@ -1,55 +1,110 @@
-import re
 import warnings
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from config import PRIMARY_EXCEL, SHEET22_NAME
+from config import PRIMARY_EXCEL, SHEET22_NAME, REGION_SHEET_NAME, REGION_CSV, LOADER_ENGINE
+from diagnostics import span
+from schema import TOTAL_COL, REVENUE_COLS, KPI_COLUMNS, mark_validated, validate_frame
 from utils import normalize_columns
 
-VOICE_COLS = [
-    "NBIP-NBIP Calls Revenue",
-    "Fixed Calls Revenue",
-    "Telekom Calls Revenue",
-    "BMobile Calls Revenue",
-    "International Calls Revenue",
-]
+def _projection(columns: list[str] | None) -> set | None:
+    # Location and Total are always needed for header detection and validation
+    if columns is None:
+        return None
+    return set(columns) | {"Location", TOTAL_COL}
 
-SMS_COLS = [
-    "A2P SMS Revenue",
-    "Telekom SMS Revenue",
-    "BMobile SMS Revenue",
-    "International SMS Revenue",
-]
-
-DATA_COL = "Mobile Data Revenue"
-
-TOTAL_COL = "Total"
 
 def _clean_columns(df: pd.DataFrame) -> pd.DataFrame:
+    # Revenue columns are coerced by the loader; only try extra columns here
     df.columns = normalize_columns(df.columns)
     for c in df.columns:
-        if isinstance(c, str):
+        if isinstance(c, str) and c != "Location" and c not in REVENUE_COLS:
             try:
                 df[c] = pd.to_numeric(df[c])
             except (TypeError, ValueError):
                 pass
     return df
 
-def _read_month_sheet(xls: pd.ExcelFile, sheet_name: str) -> pd.DataFrame:
+def _read_month_sheet(xls: pd.ExcelFile, sheet_name: str, columns: list[str] | None = KPI_COLUMNS) -> pd.DataFrame:
     # Try multiple header rows (handles title rows)
-    for h in range(5):
-        with warnings.catch_warnings():
-            warnings.filterwarnings(
-                "ignore",
-                message="Sparkline Group extension is not supported*",
-                category=UserWarning,
-            )
-            df = pd.read_excel(xls, sheet_name=sheet_name, header=h)
-        df.columns = normalize_columns(df.columns)
-        if "Location" in df.columns and TOTAL_COL in df.columns:
-            return df
+    wanted = _projection(columns)
+    usecols = (lambda c: str(c).strip() in wanted) if wanted is not None else None
+    with span("read_month_sheet", sheet=sheet_name) as rec:
+        for h in range(5):
+            with warnings.catch_warnings():
+                warnings.filterwarnings(
+                    "ignore",
+                    message="Sparkline Group extension is not supported*",
+                    category=UserWarning,
+                )
+                df = pd.read_excel(xls, sheet_name=sheet_name, header=h, usecols=usecols)
+            df.columns = normalize_columns(df.columns)
+            rec["header_attempts"] = h + 1
+            if "Location" in df.columns and TOTAL_COL in df.columns:
+                rec["rows"] = len(df)
+                return df
     raise ValueError(f"Could not detect header row for sheet: {sheet_name}")
 
-def load_all_months(path: Path = PRIMARY_EXCEL) -> dict:
+def _to_float_array(values: list) -> np.ndarray:
+    # Fast path: numbers and blanks only (None -> NaN)
+    try:
+        return np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(dtype=float)
+
+
+def _read_month_sheet_streaming(wb, sheet_name: str, columns: list[str] | None = KPI_COLUMNS) -> pd.DataFrame:
+    """
+    Read one month sheet with openpyxl's read-only, values-only iterator.
+    Styles, formatting and extensions are never parsed; only the projected
+    columns are collected (revenue columns straight into numpy arrays).
+    """
+    wanted = _projection(columns)
+    with span("read_month_sheet", sheet=sheet_name, engine="stream") as rec:
+        rows = wb[sheet_name].iter_rows(values_only=True)
+
+        # Header detection over the first rows (handles title rows)
+        header = None
+        for h, row in zip(range(5), rows):
+            names = normalize_columns("" if v is None else v for v in row)
+            rec["header_attempts"] = h + 1
+            if "Location" in names and TOTAL_COL in names:
+                header = names
+                break
+        if header is None:
+            raise ValueError(f"Could not detect header row for sheet: {sheet_name}")
+
+        positions = {}
+        for i, name in enumerate(header):
+            if name and (wanted is None or name in wanted) and name not in positions:
+                positions[name] = i
+        loc_idx = positions.pop("Location")
+        numeric = list(positions.items())
+
+        locations = []
+        buffers = [[] for _ in numeric]
+        for row in rows:
+            width = len(row)
+            loc = row[loc_idx] if loc_idx < width else None
+            vals = [row[i] if i < width else None for _, i in numeric]
+            if loc is None and all(v is None for v in vals):
+                continue
+            locations.append("" if loc is None else loc)
+            for buf, v in zip(buffers, vals):
+                buf.append(v)
+
+        data = {"Location": locations}
+        for (name, _), buf in zip(numeric, buffers):
+            data[name] = _to_float_array(buf) if name in REVENUE_COLS else pd.Series(buf, dtype=object)
+        rec["rows"] = len(locations)
+        return pd.DataFrame(data)
+
+
+def load_all_months(
+    path: Path = PRIMARY_EXCEL,
+    engine: str = LOADER_ENGINE,
+    columns: list[str] | None = KPI_COLUMNS,
+) -> dict:
     """
     Returns:
     {
@@ -57,46 +112,61 @@ def load_all_months(path: Path = PRIMARY_EXCEL) -> dict:
       'april_2024': DataFrame,
       ...
     }
+    engine: "stream" (openpyxl read-only, values only) or "pandas" (pd.read_excel).
+    columns: projection applied at read time (defaults to the KPI schema);
+    None keeps every column in the sheet.
     """
-    with warnings.catch_warnings():
-        warnings.filterwarnings(
-            "ignore",
-            message="Sparkline Group extension is not supported*",
-            category=UserWarning,
-        )
-        xls = pd.ExcelFile(path)
+    if engine == "pandas":
+        with span("open_workbook", path=str(path), engine=engine), warnings.catch_warnings():
+            warnings.filterwarnings(
+                "ignore",
+                message="Sparkline Group extension is not supported*",
+                category=UserWarning,
+            )
+            xls = pd.ExcelFile(path)
+        sheet_names = xls.sheet_names
+        read_sheet = lambda sheet: _read_month_sheet(xls, sheet, columns)
+        close = xls.close
+    else:
+        # Deferred: not needed when the model comes from a cache
+        from openpyxl import load_workbook
+
+        with span("open_workbook", path=str(path), engine=engine):
+            wb = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+        sheet_names = wb.sheetnames
+        read_sheet = lambda sheet: _read_month_sheet_streaming(wb, sheet, columns)
+        close = wb.close
+
+    try:
+        return _load_month_sheets(sheet_names, read_sheet)
+    finally:
+        close()
+
+
+def _load_month_sheets(sheet_names: list[str], read_sheet) -> dict:
     months = {}
 
-    for sheet in xls.sheet_names:
-        if sheet.strip().lower() == SHEET22_NAME.lower():
+    for sheet in sheet_names:
+        if sheet.strip().lower() in (SHEET22_NAME.lower(), REGION_SHEET_NAME.lower()):
             continue
 
-        df = _read_month_sheet(xls, sheet)
-        df = _clean_columns(df)
-
-        # Enforce required structure
-        required = ["Location", TOTAL_COL]
-        for col in required:
-            if col not in df.columns:
-                raise ValueError(f"Missing {col} in sheet {sheet}")
-
-        # Ensure numeric
-        revenue_cols = VOICE_COLS + SMS_COLS + [DATA_COL, TOTAL_COL]
-        for col in revenue_cols:
-            if col not in df.columns:
-                df[col] = 0
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-        df["Location"] = df["Location"].astype(str).str.strip()
-        # Drop sheet-level summary/total rows often present at the bottom of Excel sheets
-        # These rows are typically labelled like 'Total', 'Totals' or 'Grand Total'
-        total_mask = df["Location"].str.lower().str.contains(r"\btotal\b", na=False)
-        if total_mask.any():
-            df = df[~total_mask].copy()
-
-        # Remove completely empty location rows (blank footers)
-        df = df[df["Location"].str.strip() != ""].copy()
-        months[sheet] = df
+        df = read_sheet(sheet)
+        with span("clean_month_sheet", sheet=sheet) as rec:
+            df = _clean_columns(df)
+
+            # Required columns, numeric revenue block and Location in one pass
+            df = validate_frame(df, sheet)
+
+            # Drop sheet-level summary/total rows often present at the bottom of Excel sheets
+            # These rows are typically labelled like 'Total', 'Totals' or 'Grand Total'
+            total_mask = df["Location"].str.lower().str.contains(r"\btotal\b", na=False)
+            if total_mask.any():
+                df = df[~total_mask].copy()
+
+            # Remove completely empty location rows (blank footers)
+            df = df[df["Location"].str.strip() != ""].copy()
+            rec["rows"] = len(df)
+        months[sheet] = mark_validated(df)
 
     return months
 
@@ -113,3 +183,44 @@ def load_sheet22(path: Path = PRIMARY_EXCEL) -> pd.DataFrame:
         return df
     except Exception:
         return pd.DataFrame()
+
+
+def load_region_map(path: Path = PRIMARY_EXCEL, csv_path: Path | None = REGION_CSV) -> dict:
+    """
+    Optional location -> region mapping.
+    Read from REGION_CSV when configured, otherwise from the REGION_SHEET_NAME sheet.
+    Expects a Location column and a Region (or Province) column; returns {} if absent.
+    """
+    try:
+        if csv_path is not None:
+            df = pd.read_csv(csv_path)
+        else:
+            # Sheet names only (read-only load): most workbooks have no region sheet
+            from openpyxl import load_workbook
+
+            wb = load_workbook(path, read_only=True, keep_links=False)
+            try:
+                names = {name.strip().lower() for name in wb.sheetnames}
+            finally:
+                wb.close()
+            if REGION_SHEET_NAME.lower() not in names:
+                return {}
+            with warnings.catch_warnings():
+                warnings.filterwarnings(
+                    "ignore",
+                    message="Sparkline Group extension is not supported*",
+                    category=UserWarning,
+                )
+                df = pd.read_excel(path, sheet_name=REGION_SHEET_NAME)
+    except Exception:
+        return {}
+
+    df.columns = normalize_columns(df.columns)
+    region_col = next((c for c in ("Region", "Province") if c in df.columns), None)
+    if "Location" not in df.columns or region_col is None:
+        return {}
+
+    df = df[["Location", region_col]].dropna()
+    locations = df["Location"].astype(str).str.strip()
+    regions = df[region_col].astype(str).str.strip()
+    return {loc: reg for loc, reg in zip(locations, regions) if loc and reg}
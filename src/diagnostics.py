@@ -0,0 +1,107 @@
+import itertools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import DIAGNOSTICS_LOG, DIAGNOSTICS_MEMORY
+
+_LOCK = threading.Lock()
+_RECORDS: deque = deque(maxlen=2000)
+_RUN_IDS = itertools.count(1)
+_LOCAL = threading.local()
+
+if DIAGNOSTICS_MEMORY and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+def _memory_bytes() -> Optional[int]:
+    # Prefer tracemalloc when enabled (exact Python allocations), else process RSS on Linux
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0]
+    return rss_bytes()
+
+
+def rss_bytes(pid: Optional[int] = None) -> Optional[int]:
+    """Resident set size of this process or `pid` (Linux), or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid or 'self'}/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _write_jsonl(record: Dict[str, Any], path: Path) -> None:
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+    except OSError:
+        pass
+
+
+@contextmanager
+def span(stage: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time a pipeline stage. The yielded dict can be enriched by the caller
+    (e.g. rec["rows"] = len(df)). Nested spans share the run_id of the outermost one.
+    Records: stage, run_id, depth, parent, seconds, memory_delta_mb, plus any fields.
+    """
+    stack = getattr(_LOCAL, "stack", None)
+    if stack is None:
+        stack = _LOCAL.stack = []
+    run_id = stack[-1]["run_id"] if stack else next(_RUN_IDS)
+    record: Dict[str, Any] = {
+        "stage": stage,
+        "run_id": run_id,
+        "depth": len(stack),
+        "parent": stack[-1]["stage"] if stack else None,
+        "started_at": time.time(),
+        **fields,
+    }
+    mem_before = _memory_bytes()
+    t0 = time.perf_counter()
+    stack.append(record)
+    try:
+        yield record
+    finally:
+        stack.pop()
+        record["seconds"] = time.perf_counter() - t0
+        mem_after = _memory_bytes()
+        record["memory_delta_mb"] = (
+            (mem_after - mem_before) / 1e6 if mem_before is not None and mem_after is not None else None
+        )
+        with _LOCK:
+            _RECORDS.append(record)
+        if DIAGNOSTICS_LOG is not None:
+            _write_jsonl(record, DIAGNOSTICS_LOG)
+
+
+def recent_spans() -> List[Dict[str, Any]]:
+    with _LOCK:
+        return list(_RECORDS)
+
+
+def last_run(stage: str) -> List[Dict[str, Any]]:
+    """The most recent `stage` span and every span nested inside it (in start order)."""
+    records = recent_spans()
+    roots = [r for r in records if r["stage"] == stage]
+    if not roots:
+        return []
+    root = roots[-1]
+    start, end = root["started_at"], root["started_at"] + root["seconds"]
+    nested = [
+        r for r in records
+        if r["run_id"] == root["run_id"] and r["depth"] >= root["depth"] and start <= r["started_at"] <= end
+    ]
+    return sorted(nested, key=lambda r: (r["started_at"], r["depth"]))
+
+
+def clear_spans() -> None:
+    with _LOCK:
+        _RECORDS.clear()
@@ -0,0 +1,66 @@
+"""
+Import-time profile of the app's modules.
+
+Usage:
+  python import_profile.py                 # profile `import main`
+  python import_profile.py model_store --top 15 --repeat 5
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+reports the total import time plus the self time summed per top-level package
+(median over --repeat runs), so heavy dependencies stand out.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict
+
+SRC_DIR = Path(__file__).resolve().parent
+
+
+def profile_import(module: str) -> tuple[float, Dict[str, float]]:
+    """(total seconds, {top-level package: self seconds}) for one cold import."""
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+
+    per_package: Dict[str, float] = defaultdict(float)
+    total = 0.0
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        except ValueError:
+            continue
+        per_package[name.split(".")[0]] += int(self_us) / 1e6
+        if name == module:
+            total = int(cumulative_us) / 1e6
+    return total, dict(per_package)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Profile the import time of an app module.")
+    parser.add_argument("module", nargs="?", default="main")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+
+    runs = [profile_import(args.module) for _ in range(args.repeat)]
+    total = statistics.median(t for t, _ in runs)
+    packages = {name: statistics.median(r[1].get(name, 0.0) for r in runs) for name in runs[0][1]}
+
+    print(f"import {args.module}: {total * 1000:.0f} ms (median of {args.repeat})")
+    for name, seconds in sorted(packages.items(), key=lambda kv: kv[1], reverse=True)[:args.top]:
+        print(f"  {name:<24} {seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
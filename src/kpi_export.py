@@ -0,0 +1,292 @@
+"""
+Bulk export of the computed KPIs to CSV, Excel or Parquet.
+
+Usage:
+  python kpi_export.py --format csv                  # one CSV per table under exports/kpi_export_<month>
+  python kpi_export.py --format xlsx --out kpis.xlsx  # one sheet per table
+  python kpi_export.py --format parquet --tables location_breakdown,mom_deltas
+
+Tables (all read from the cached model):
+- monthly_summary: network KPIs per month, with MoM / YoY movement
+- location_breakdown: revenue per location and month, by stream
+- mom_deltas: per-location MoM and YoY change for every month
+- trend: monthly, trailing-3, trailing-12 and YTD totals, data share and zero-revenue sites
+
+Tables are produced in chunks of rows and every writer appends chunk by chunk
+(CSV appends, openpyxl write-only sheets, a Parquet row group per chunk), so a
+large extract is never held in memory as one frame or one file.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import zipfile
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from config import EXPORT_DIR, PRIMARY_EXCEL
+from location_matrix import STREAMS
+
+FORMATS = ("csv", "xlsx", "parquet")
+CHUNK_ROWS = 50_000
+_XLSX_MAX_ROWS = 1_048_575  # data rows per sheet (plus the header)
+_STREAM_COLUMNS = {"total": "Total", "voice": "Voice", "sms": "SMS", "data": "Data"}
+
+
+def _monthly_summary(model: Dict[str, Any], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    matrix = model["matrix"]
+    calendar = model["calendar"]
+    kpis = [model["kpis_by_month"][m] for m in matrix.months]
+    totals = model["deltas"].totals
+    out = {"Month": matrix.months, "Label": [calendar.label(m) for m in matrix.months]}
+    for s in STREAMS:
+        out[_STREAM_COLUMNS[s]] = matrix.column_totals(s)
+    out.update({
+        "Locations Reporting": matrix.present.sum(axis=0),
+        "Avg Revenue per Location": [k["avg_revenue"] for k in kpis],
+        "Data Share %": [k["data_share_pct"] for k in kpis],
+        "Zero-Revenue Sites": [k["zero_revenue_sites"] for k in kpis],
+        "Top Site": [k["top_site"] for k in kpis],
+        "Top Site Revenue": [k["top_site_value"] for k in kpis],
+        "Top 10 Share %": [k["concentration_ratio"] * 100.0 for k in kpis],
+    })
+    for col in ["Previous Month", "MoM Delta", "MoM %", "YoY Month", "YoY Delta", "YoY %"]:
+        out[col] = totals[col].to_numpy()
+    yield pd.DataFrame(out)
+
+
+def _location_blocks(model: Dict[str, Any], chunk_rows: int) -> Iterator[tuple]:
+    # (row slice, location names, row indices, column indices) per block of whole locations
+    matrix = model["matrix"]
+    n_loc, n_month = matrix.shape
+    step = max(1, chunk_rows // max(n_month, 1))
+    names = matrix.locations.to_numpy()
+    for start in range(0, n_loc, step):
+        block = slice(start, min(start + step, n_loc))
+        rows, cols = np.nonzero(matrix.present[block])
+        yield block, names[block][rows], rows, cols
+
+
+def _location_breakdown(model: Dict[str, Any], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    matrix = model["matrix"]
+    months = np.asarray(matrix.months, dtype=object)
+    for block, locations, rows, cols in _location_blocks(model, chunk_rows):
+        out = {"Location": locations, "Month": months[cols]}
+        for s in STREAMS:
+            out[_STREAM_COLUMNS[s]] = matrix.values[s][block][rows, cols]
+        yield pd.DataFrame(out)
+
+
+def _mom_deltas(model: Dict[str, Any], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    matrix = model["matrix"]
+    deltas = model["deltas"]
+    months = np.asarray(matrix.months, dtype=object)
+    prev_names = np.asarray([matrix.months[p] if p >= 0 else None for p in deltas.prev_pos], dtype=object)
+    yoy_names = np.asarray([matrix.months[p] if p >= 0 else None for p in deltas.yoy_pos], dtype=object)
+    total = matrix.values["total"]
+    for block, locations, rows, cols in _location_blocks(model, chunk_rows):
+        keep = deltas.prev_pos[cols] >= 0
+        rows, cols, locations = rows[keep], cols[keep], locations[keep]
+        present = matrix.present[block]
+        # Blank (NaN) where the location has no row in the comparison month, never a delta from 0
+        in_prev = present[rows, deltas.prev_pos[cols]]
+        in_yoy = (deltas.yoy_pos[cols] >= 0) & present[rows, np.clip(deltas.yoy_pos[cols], 0, None)]
+        yield pd.DataFrame({
+            "Location": locations,
+            "Month": months[cols],
+            "Total": total[block][rows, cols],
+            "Previous Month": prev_names[cols],
+            "MoM Delta": np.where(in_prev, deltas.mom_delta[block][rows, cols], np.nan),
+            "MoM %": np.where(in_prev, deltas.mom_pct[block][rows, cols], np.nan),
+            "YoY Month": yoy_names[cols],
+            "YoY Delta": np.where(in_yoy, deltas.yoy_delta[block][rows, cols], np.nan),
+            "YoY %": np.where(in_yoy, deltas.yoy_pct[block][rows, cols], np.nan),
+        })
+
+
+def _trend(model: Dict[str, Any], chunk_rows: int) -> Iterator[pd.DataFrame]:
+    trend = model["trend"]
+    window_trend = model["window_trend"]
+    calendar = model["calendar"]
+    out = {"Month": trend["months"], "Label": [calendar.label(m) for m in trend["months"]]}
+    out.update(window_trend["series"])
+    out["Data Share %"] = trend["data_share_pct"]
+    out["Zero-Revenue Sites"] = trend["zero_sites"]
+    yield pd.DataFrame(out)
+
+
+# name -> chunk generator(model, chunk_rows)
+TABLES: Dict[str, Callable[[Dict[str, Any], int], Iterator[pd.DataFrame]]] = {
+    "monthly_summary": _monthly_summary,
+    "location_breakdown": _location_breakdown,
+    "mom_deltas": _mom_deltas,
+    "trend": _trend,
+}
+
+
+def available_formats() -> List[str]:
+    """Parquet needs pyarrow, which is optional."""
+    return [f for f in FORMATS if f != "parquet" or find_spec("pyarrow") is not None]
+
+
+def write_csv(chunks: Iterator[pd.DataFrame], path: Path) -> int:
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for i, df in enumerate(chunks):
+            df.to_csv(f, header=i == 0, index=False)
+            rows += len(df)
+    return rows
+
+
+def write_parquet(chunks: Iterator[pd.DataFrame], path: Path) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = 0
+    writer = None
+    try:
+        for df in chunks:
+            if writer is None:
+                # A column that is empty in the first chunk (e.g. no YoY month yet) is still text
+                schema = pa.Schema.from_pandas(df, preserve_index=False)
+                schema = pa.schema([f.with_type(pa.string()) if pa.types.is_null(f.type) else f for f in schema])
+                writer = pq.ParquetWriter(str(path), schema, compression="zstd")
+            table = pa.Table.from_pandas(df, schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+            rows += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _xlsx_rows(df: pd.DataFrame) -> Iterator[list]:
+    # Blank cells for missing values (NaN is not valid in a workbook)
+    cells = df.astype(object).where(df.notna(), None)
+    return (list(row) for row in cells.itertuples(index=False, name=None))
+
+
+def write_xlsx_sheets(tables: Dict[str, Iterator[pd.DataFrame]], path: Path) -> Dict[str, int]:
+    """One write-only sheet per table; a table longer than a sheet continues on name_2, name_3, ..."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    counts = {}
+    for name, chunks in tables.items():
+        ws, part, in_sheet, header = None, 1, 0, None
+        rows = 0
+        for df in chunks:
+            header = list(df.columns)
+            for row in _xlsx_rows(df):
+                if ws is None or in_sheet == _XLSX_MAX_ROWS:
+                    ws = wb.create_sheet(name if part == 1 else f"{name}_{part}"[:31])
+                    ws.append(header)
+                    part, in_sheet = part + 1, 0
+                ws.append(row)
+                in_sheet += 1
+                rows += 1
+        if ws is None:
+            wb.create_sheet(name)
+        counts[name] = rows
+    wb.save(str(path))
+    return counts
+
+
+def export_kpis(
+    model: Dict[str, Any],
+    fmt: str = "csv",
+    out: Optional[Path] = None,
+    tables: Optional[Sequence[str]] = None,
+    chunk_rows: int = CHUNK_ROWS,
+) -> Dict[str, Any]:
+    """
+    Write the selected tables (default: all). CSV and Parquet write one file per table into
+    the directory `out`; xlsx writes one workbook. Returns {"paths": [...], "rows": {table: n}}.
+    Raises ValueError for an unknown format or table.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r} (expected one of {', '.join(FORMATS)})")
+    names = list(tables or TABLES)
+    unknown = [n for n in names if n not in TABLES]
+    if unknown:
+        raise ValueError(f"Unknown table(s): {', '.join(unknown)}")
+
+    default = EXPORT_DIR / f"kpi_export_{model['latest_name']}"
+    chunks = {n: TABLES[n](model, chunk_rows) for n in names}
+    if fmt == "xlsx":
+        path = Path(out or default.with_suffix(".xlsx"))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return {"paths": [path], "rows": write_xlsx_sheets(chunks, path)}
+
+    directory = Path(out or default)
+    directory.mkdir(parents=True, exist_ok=True)
+    writer = write_csv if fmt == "csv" else write_parquet
+    paths, rows = [], {}
+    for name, table_chunks in chunks.items():
+        path = directory / f"{name}.{fmt}"
+        rows[name] = writer(table_chunks, path)
+        paths.append(path)
+    return {"paths": paths, "rows": rows}
+
+
+def export_archive(model: Dict[str, Any], fmt: str) -> Path:
+    """
+    Single downloadable file in EXPORT_DIR: the workbook for xlsx, otherwise a zip of the
+    per-table files. Built in a private temporary directory, then moved into place.
+    """
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    stem = f"SINBIP_KPI_Export_{model['latest_name']}"
+    final = EXPORT_DIR / f"{stem}.{'xlsx' if fmt == 'xlsx' else f'{fmt}.zip'}"
+    work = Path(tempfile.mkdtemp(prefix="sinbip_export_", dir=EXPORT_DIR))
+    try:
+        result = export_kpis(model, fmt, out=work / (f"{stem}.xlsx" if fmt == "xlsx" else stem))
+        if fmt == "xlsx":
+            built = result["paths"][0]
+        else:
+            built = work / final.name
+            with zipfile.ZipFile(built, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                for path in result["paths"]:
+                    zf.write(path, arcname=path.name)
+        tmp = final.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        shutil.move(str(built), tmp)
+        tmp.replace(final)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return final
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export SINBIP KPI tables to CSV, Excel or Parquet.")
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--out", type=Path, help="Output directory (csv/parquet) or workbook path (xlsx)")
+    parser.add_argument("--tables", help=f"Comma-separated subset of: {', '.join(TABLES)}")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--workbook", type=Path, default=PRIMARY_EXCEL)
+    args = parser.parse_args()
+
+    from model_store import get_model
+
+    model = get_model(args.workbook)
+    if model is None:
+        print(f"No monthly sheets found in {args.workbook.name}")
+        sys.exit(1)
+    tables = [t.strip() for t in args.tables.split(",") if t.strip()] if args.tables else None
+    try:
+        result = export_kpis(model, args.format, out=args.out, tables=tables, chunk_rows=args.chunk_rows)
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    for name, rows in result["rows"].items():
+        print(f"{name:<20} {rows:>10,} rows")
+    for path in result["paths"]:
+        print(f"-> {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,12 @@
+import numpy as np
 import pandas as pd
-from typing import Dict, Any, Tuple
-
-VOICE_COLS = [
-    "NBIP-NBIP Calls Revenue",
-    "Fixed Calls Revenue",
-    "Telekom Calls Revenue",
-    "BMobile Calls Revenue",
-    "International Calls Revenue",
-]
-
-SMS_COLS = [
-    "A2P SMS Revenue",
-    "Telekom SMS Revenue",
-    "BMobile SMS Revenue",
-    "International SMS Revenue",
-]
-
-DATA_COL = "Mobile Data Revenue"
-TOTAL_COL = "Total"
+from dataclasses import dataclass
+from typing import Dict, Any, Tuple, Optional
+
+from location_matrix import LocationMatrix
+from schema import VOICE_COLS, SMS_COLS, DATA_COL, TOTAL_COL, is_validated
+from utils import CalendarIndex
+from window_service import WINDOWS, WindowAggregates, build_window_aggregates
 
 def calculate_kpis(df: pd.DataFrame) -> dict:
     empty_sites = pd.DataFrame(columns=["Location", TOTAL_COL])
@@ -36,9 +25,14 @@ def calculate_kpis(df: pd.DataFrame) -> dict:
             "concentration_ratio": 0.0,
         }
 
-    work = df.copy()
-    work["Location"] = work.get("Location", "").astype(str)
-    work[TOTAL_COL] = pd.to_numeric(work[TOTAL_COL], errors="coerce").fillna(0)
+    # Frames from the loader are already coerced (schema.validate_frame): no copy, no re-coercion
+    validated = is_validated(df)
+    if validated:
+        work = df
+    else:
+        work = df.copy()
+        work["Location"] = work.get("Location", "").astype(str)
+        work[TOTAL_COL] = pd.to_numeric(work[TOTAL_COL], errors="coerce").fillna(0)
 
     total_revenue = float(work[TOTAL_COL].sum())
     avg_revenue = float(work[TOTAL_COL].mean()) if len(work) else 0.0
@@ -46,12 +40,15 @@ def calculate_kpis(df: pd.DataFrame) -> dict:
     def _sum_cols(cols: list[str]) -> float:
         if not all(c in work.columns for c in cols):
             return 0.0
-        sub = work[cols].apply(pd.to_numeric, errors="coerce").fillna(0)
+        sub = work[cols] if validated else work[cols].apply(pd.to_numeric, errors="coerce").fillna(0)
         return float(sub.to_numpy().sum())
 
     voice_revenue = _sum_cols(VOICE_COLS)
     sms_revenue = _sum_cols(SMS_COLS)
-    data_revenue = float(pd.to_numeric(work.get(DATA_COL, 0), errors="coerce").fillna(0).sum())
+    if validated:
+        data_revenue = float(work[DATA_COL].sum())
+    else:
+        data_revenue = float(pd.to_numeric(work.get(DATA_COL, 0), errors="coerce").fillna(0).sum())
 
     zero_mask = work[TOTAL_COL] == 0
     zero_revenue_locations = work.loc[zero_mask, "Location"].astype(str).tolist()
@@ -102,21 +99,178 @@ def build_trend_series(month_dfs: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
     - data_share_pct: list[float]
     - zero_sites: list[int]
     """
-    months = list(month_dfs.keys())
-    total = []
-    data_share = []
-    zero_sites = []
-
-    for m in months:
-        df = month_dfs[m]
-        k = calculate_kpis(df)
-        total.append(k["total_revenue"])
-        data_share.append(k["data_share_pct"])
-        zero_sites.append(k["zero_revenue_sites"])
+    return trend_from_kpis({m: calculate_kpis(df) for m, df in month_dfs.items()})
+
 
+def trend_from_kpis(kpis_by_month: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Same trend object, from KPIs already calculated per month (chronological keys)."""
+    months = list(kpis_by_month.keys())
     return {
         "months": months,
-        "total_revenue": total,
-        "data_share_pct": data_share,
-        "zero_sites": zero_sites,
+        "total_revenue": [kpis_by_month[m]["total_revenue"] for m in months],
+        "data_share_pct": [kpis_by_month[m]["data_share_pct"] for m in months],
+        "zero_sites": [kpis_by_month[m]["zero_revenue_sites"] for m in months],
+    }
+
+
+def build_window_trend(windows: WindowAggregates) -> Dict[str, Any]:
+    """
+    Window variants of the total revenue trend:
+    - months: list[str] (chronological)
+    - series: {"Monthly" | "Trailing 3" | "Trailing 12" | "YTD": list[float]}
+    """
+    return {
+        "months": list(windows.matrix.months),
+        "series": {label: windows.series(w) for label, w in WINDOWS.items()},
     }
+
+
+def _pct_change(delta: np.ndarray, base: np.ndarray) -> np.ndarray:
+    # Undefined (NaN) when the base is zero or missing
+    out = np.full(np.shape(delta), np.nan)
+    np.divide(delta, base, out=out, where=(base != 0) & ~np.isnan(base))
+    return out * 100.0
+
+
+@dataclass(frozen=True)
+class MonthDeltas:
+    """
+    MoM and YoY deltas precomputed for every month, at total and per-location level.
+    - totals: one row per month (Month, Total, Previous Month, MoM Delta, MoM %,
+      YoY Month, YoY Delta, YoY %)
+    - prev_pos / yoy_pos: column position of the comparison month (-1 if none)
+    - mom_delta / yoy_delta: (L, M) per-location deltas (NaN where no comparison month,
+      or the location is absent from either month)
+    - mom_pct / yoy_pct: (L, M) percent change (NaN also where the base is zero)
+    """
+    matrix: LocationMatrix
+    totals: pd.DataFrame
+    prev_pos: np.ndarray
+    yoy_pos: np.ndarray
+    mom_delta: np.ndarray
+    mom_pct: np.ndarray
+    yoy_delta: np.ndarray
+    yoy_pct: np.ndarray
+
+    def previous_month(self, month: str) -> Optional[str]:
+        p = int(self.prev_pos[self.matrix.month_pos(month)])
+        return self.matrix.months[p] if p >= 0 else None
+
+    def same_month_last_year(self, month: str) -> Optional[str]:
+        p = int(self.yoy_pos[self.matrix.month_pos(month)])
+        return self.matrix.months[p] if p >= 0 else None
+
+    def compare(self, current: str, previous: str) -> dict:
+        """calc_mom-style result for any month pair, from precomputed column totals."""
+        col_totals = self.totals["Total"].to_numpy()
+        current_total = float(col_totals[self.matrix.month_pos(current)])
+        previous_total = float(col_totals[self.matrix.month_pos(previous)])
+        delta = current_total - previous_total
+        pct_change = (delta / previous_total * 100.0) if previous_total else 0.0
+        direction = "up" if delta > 0 else "down" if delta < 0 else "flat"
+        return {
+            "current_total": current_total,
+            "previous_total": previous_total,
+            "delta": delta,
+            "pct_change": pct_change,
+            "direction": direction,
+        }
+
+    def mom(self, month: str) -> Optional[dict]:
+        previous = self.previous_month(month)
+        return self.compare(month, previous) if previous else None
+
+    def location_deltas(self, current: str, previous: Optional[str] = None) -> pd.DataFrame:
+        """
+        Per-location movement between two months (defaults to the previous month).
+        Returns columns: Location, Current, Previous, Delta, Pct Change
+        Current / Previous are NaN where the location is absent from that month, and
+        Delta / Pct Change unless it is present in both.
+        """
+        previous = previous or self.previous_month(current)
+        if previous is None:
+            return pd.DataFrame(columns=["Location", "Current", "Previous", "Delta", "Pct Change"])
+        total = self.matrix.values["total"]
+        present = self.matrix.present
+        j, p = self.matrix.month_pos(current), self.matrix.month_pos(previous)
+        cur = np.where(present[:, j], total[:, j], np.nan)
+        prev = np.where(present[:, p], total[:, p], np.nan)
+        delta = cur - prev
+        return pd.DataFrame(
+            {
+                "Location": self.matrix.locations,
+                "Current": cur,
+                "Previous": prev,
+                "Delta": delta,
+                "Pct Change": _pct_change(delta, prev),
+            }
+        )
+
+    def movers(self, current: str, previous: Optional[str] = None, n: int = 5) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Returns (top gainers, top decliners) by absolute delta, among locations present in both months."""
+        df = self.location_deltas(current, previous)
+        gainers = df[df["Delta"] > 0].nlargest(n, "Delta")
+        decliners = df[df["Delta"] < 0].nsmallest(n, "Delta")
+        return gainers.reset_index(drop=True), decliners.reset_index(drop=True)
+
+
+def build_month_deltas(matrix: LocationMatrix, calendar: Optional[CalendarIndex] = None) -> MonthDeltas:
+    """
+    Compute MoM (adjacent sheets) and YoY (same month last year) deltas for
+    every month in one vectorised pass over the location matrix. A location only
+    gets a delta where it is present in both months (absent is not $0).
+    Comparison months come from the workbook calendar (built from the matrix if not given).
+    """
+    total = matrix.values["total"]
+    calendar = calendar or CalendarIndex(matrix.months)
+
+    def _positions(names: list) -> np.ndarray:
+        return np.array([matrix.month_pos(n) if n in matrix.months else -1 for n in names], dtype=np.int64)
+
+    prev_pos = _positions([calendar.previous(m) if m in calendar else None for m in matrix.months])
+    yoy_pos = _positions([calendar.same_month_last_year(m) if m in calendar else None for m in matrix.months])
+
+    def _deltas(pos: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        col = np.clip(pos, 0, None)
+        both = (pos >= 0) & matrix.present & matrix.present[:, col]
+        base = np.where(both, total[:, col], np.nan)
+        delta = total - base
+        return delta, _pct_change(delta, base)
+
+    mom_delta, mom_pct = _deltas(prev_pos)
+    yoy_delta, yoy_pct = _deltas(yoy_pos)
+
+    col_totals = total.sum(axis=0)
+
+    def _total_deltas(pos: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        has = pos >= 0
+        base = np.where(has, col_totals[np.clip(pos, 0, None)], np.nan)
+        delta = col_totals - base
+        return delta, _pct_change(delta, base)
+
+    mom_total, mom_total_pct = _total_deltas(prev_pos)
+    yoy_total, yoy_total_pct = _total_deltas(yoy_pos)
+
+    totals = pd.DataFrame(
+        {
+            "Month": matrix.months,
+            "Total": col_totals,
+            "Previous Month": [matrix.months[p] if p >= 0 else None for p in prev_pos],
+            "MoM Delta": mom_total,
+            "MoM %": mom_total_pct,
+            "YoY Month": [matrix.months[p] if p >= 0 else None for p in yoy_pos],
+            "YoY Delta": yoy_total,
+            "YoY %": yoy_total_pct,
+        }
+    )
+
+    return MonthDeltas(
+        matrix=matrix,
+        totals=totals,
+        prev_pos=prev_pos,
+        yoy_pos=yoy_pos,
+        mom_delta=mom_delta,
+        mom_pct=mom_pct,
+        yoy_delta=yoy_delta,
+        yoy_pct=yoy_pct,
+    )
@@ -0,0 +1,67 @@
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class LocationIndex:
+    """
+    Prebuilt lookup structure for the location picker.
+    - names: sorted location names (multiselect options)
+    - ranked: names ordered by cumulative revenue (highest first)
+    - cumulative: cumulative revenue per location
+    Built once per workbook and cached with the model.
+    """
+    names: Tuple[str, ...] = ()
+    ranked: Tuple[str, ...] = ()
+    cumulative: Dict[str, float] = field(default_factory=dict)
+    _folded: Tuple[Tuple[str, str], ...] = ()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def default_selection(self, n: int = 5) -> List[str]:
+        return list(self.ranked[:n]) or list(self.names[:n])
+
+    def prefix(self, text: str) -> List[str]:
+        """Case-insensitive prefix lookup (binary search over folded names)."""
+        key = str(text).strip().casefold()
+        if not key:
+            return list(self.names)
+        start = bisect_left(self._folded, (key, ""))
+        out = []
+        for folded, name in self._folded[start:]:
+            if not folded.startswith(key):
+                break
+            out.append(name)
+        return out
+
+    def search(self, text: str) -> List[str]:
+        """
+        Case-insensitive search: prefix matches first, then substring matches,
+        both in sorted order.
+        """
+        key = str(text).strip().casefold()
+        if not key:
+            return list(self.names)
+        head = self.prefix(key)
+        seen = set(head)
+        tail = [name for folded, name in self._folded if key in folded and name not in seen]
+        return head + tail
+
+
+def build_location_index(trend_df: pd.DataFrame) -> LocationIndex:
+    """
+    Build the index from the long Sheet22 frame (Month, Location, Total).
+    """
+    if trend_df is None or trend_df.empty or "Location" not in trend_df.columns:
+        return LocationIndex()
+
+    totals = trend_df.groupby("Location", sort=True)["Total"].sum()
+    names = tuple(sorted(str(n) for n in totals.index))
+    ranked = tuple(str(n) for n in totals.sort_values(ascending=False, kind="stable").index)
+    cumulative = {str(k): float(v) for k, v in totals.items()}
+    folded = tuple(sorted((n.casefold(), n) for n in names))
+    return LocationIndex(names=names, ranked=ranked, cumulative=cumulative, _folded=folded)
@@ -0,0 +1,102 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from schema import VOICE_COLS, SMS_COLS, DATA_COL, TOTAL_COL, is_validated
+from utils import parse_month_sheet_name
+
+STREAMS = ("total", "voice", "sms", "data")
+
+
+@dataclass(frozen=True)
+class LocationMatrix:
+    """
+    Dense locations x months view of the monthly sheets.
+    - locations: sorted location names (row axis)
+    - months: month sheet names in the order given (column axis)
+    - periods: parsed month for each column (None if the name is not a month)
+    - values: {"total"|"voice"|"sms"|"data": float array of shape (L, M)}
+    - present: bool array (L, M), True where the location appears in that month
+    """
+    locations: pd.Index
+    months: List[str]
+    periods: List[Optional[datetime]]
+    values: Dict[str, np.ndarray] = field(default_factory=dict)
+    present: np.ndarray = field(default_factory=lambda: np.zeros((0, 0), dtype=bool))
+
+    @property
+    def shape(self) -> tuple:
+        return (len(self.locations), len(self.months))
+
+    def month_pos(self, month: str) -> int:
+        return self.months.index(month)
+
+    def column_totals(self, stream: str = "total") -> np.ndarray:
+        return self.values[stream].sum(axis=0)
+
+    def frame(self, stream: str = "total") -> pd.DataFrame:
+        return pd.DataFrame(self.values[stream], index=self.locations, columns=self.months)
+
+
+def _stream_values(df: pd.DataFrame, cols: list[str]) -> np.ndarray:
+    # Mirrors calculate_kpis: a stream is only counted when all its columns exist
+    if not all(c in df.columns for c in cols):
+        return np.zeros(len(df), dtype=float)
+    sub = df[cols] if is_validated(df) else df[cols].apply(pd.to_numeric, errors="coerce").fillna(0)
+    return sub.to_numpy(dtype=float).sum(axis=1)
+
+
+def build_location_matrix(month_dfs: Dict[str, pd.DataFrame]) -> LocationMatrix:
+    """
+    Align every month frame on a shared, sorted location index in one pass.
+    Duplicate location rows inside a month are summed.
+    """
+    months = list(month_dfs.keys())
+    periods = [parse_month_sheet_name(m) for m in months]
+
+    loc_parts = []
+    col_parts = []
+    stream_parts: Dict[str, list] = {s: [] for s in STREAMS}
+    for j, name in enumerate(months):
+        df = month_dfs[name]
+        if df is None or df.empty or "Location" not in df.columns:
+            continue
+        loc_parts.append(df["Location"].astype(str).str.strip().to_numpy())
+        col_parts.append(np.full(len(df), j, dtype=np.int64))
+        stream_parts["total"].append(_stream_values(df, [TOTAL_COL]))
+        stream_parts["voice"].append(_stream_values(df, VOICE_COLS))
+        stream_parts["sms"].append(_stream_values(df, SMS_COLS))
+        stream_parts["data"].append(_stream_values(df, [DATA_COL]))
+
+    if not loc_parts:
+        empty = np.zeros((0, len(months)), dtype=float)
+        return LocationMatrix(
+            locations=pd.Index([], name="Location"),
+            months=months,
+            periods=periods,
+            values={s: empty.copy() for s in STREAMS},
+            present=np.zeros((0, len(months)), dtype=bool),
+        )
+
+    codes, uniques = pd.factorize(np.concatenate(loc_parts), sort=True)
+    cols = np.concatenate(col_parts)
+    n_loc, n_month = len(uniques), len(months)
+    flat = codes * n_month + cols
+
+    values = {}
+    for s in STREAMS:
+        weights = np.concatenate(stream_parts[s])
+        values[s] = np.bincount(flat, weights=weights, minlength=n_loc * n_month).reshape(n_loc, n_month)
+
+    present = np.bincount(flat, minlength=n_loc * n_month).reshape(n_loc, n_month) > 0
+
+    return LocationMatrix(
+        locations=pd.Index(uniques, name="Location"),
+        months=months,
+        periods=periods,
+        values=values,
+        present=present,
+    )
@@ -1,22 +1,28 @@
 import io
 from pathlib import Path
 
-import altair as alt
 import pandas as pd
 import streamlit as st
 
 from auth import authenticate, User
-from config import APP_TITLE, EXPORT_DIR
-from data_loader import load_all_months, load_sheet22
-from kpi_service import calculate_kpis, calc_mom, build_trend_series, VOICE_COLS, SMS_COLS
-from pdf_export import export_board_pdf
-from sheet22_service import build_sheet22_context
-from sparkline import build_location_trend_frame, multi_location_chart
-from utils import fmt_currency, fmt_pct, sort_month_sheets
+from config import APP_TITLE, PRIMARY_EXCEL
+from diagnostics import last_run, recent_spans, span
+from kpi_export import available_formats, export_archive
+from model_store import get_model, prefetch_model
+from query_service import EXAMPLE_QUERIES, QueryError, get_query_store
+from scenario_service import available_workbooks, compare_workbooks
+from schema import VOICE_COLS, SMS_COLS
+from sparkline import multi_location_chart
+from utils import fmt_currency, fmt_pct
+from warmup import cached_board_pdf
 
 
 st.set_page_config(page_title=APP_TITLE, layout="wide", initial_sidebar_state="collapsed")
 
+# Copy-on-write: slices of the shared model frames are lazy views and any write to a
+# derived frame copies, so the views here need no defensive .copy() (default from pandas 3.0)
+pd.set_option("mode.copy_on_write", True)
+
 
 # =========================
 # Streamlit 1.40-safe styling
@@ -246,6 +252,9 @@ def card(title: str, subtitle: str | None = None, chip: str | None = None):
 # Altair theme (safe dict theme)
 # -----------------------------
 def _enable_board_theme():
+    # Charts only render after login, so Altair is imported here rather than at module load
+    import altair as alt
+
     def board_theme():
         return {
             "config": {
@@ -296,49 +305,15 @@ def _set_user(user: User | None) -> None:
 # -----------------------------
 def load_model():
     try:
-        months_raw = load_all_months()  # dict: {sheet_name: df}
+        with span("load_model"):
+            model = get_model()
     except Exception as e:
         st.error(f"Failed to load monthly sheets: {e}")
         return None
-    if not months_raw:
+    if model is None:
         st.error("No monthly sheets found in the primary Excel workbook.")
         return None
-
-    month_names_sorted = sort_month_sheets(list(months_raw.keys()))
-    if not month_names_sorted:
-        month_names_sorted = sorted(months_raw.keys())
-
-    months = {name: months_raw[name] for name in month_names_sorted}
-
-    latest_name = month_names_sorted[-1]
-    latest_df = months[latest_name]
-    latest_kpis = calculate_kpis(latest_df)
-
-    mom = None
-    mom_label = None
-    if len(month_names_sorted) >= 2:
-        prev_name = month_names_sorted[-2]
-        prev_df = months[prev_name]
-        mom = calc_mom(latest_df, prev_df)
-        mom_label = f"MoM compares {prev_name} -> {latest_name}"
-
-    trend = build_trend_series(months)
-
-    sheet22_df = load_sheet22()
-    sheet22_ctx = build_sheet22_context(sheet22_df)
-    location_trend_df = build_location_trend_frame(sheet22_df)
-
-    return {
-        "months": months,
-        "latest_name": latest_name,
-        "latest_df": latest_df,
-        "latest_kpis": latest_kpis,
-        "mom": mom,
-        "mom_label": mom_label,
-        "trend": trend,
-        "sheet22_ctx": sheet22_ctx,
-        "location_trend_df": location_trend_df,
-    }
+    return model
 
 
 # -----------------------------
@@ -413,6 +388,8 @@ def render_mom(mom: dict | None, mom_label: str | None):
 
 
 def render_bar_chart(df: pd.DataFrame):
+    import altair as alt
+
     chart = (
         alt.Chart(df)
         .mark_bar(cornerRadiusTopLeft=5, cornerRadiusTopRight=5)
@@ -426,11 +403,23 @@ def render_bar_chart(df: pd.DataFrame):
     st.altair_chart(chart, use_container_width=True)
 
 
-def render_trend(trend: dict):
+def render_trend(trend: dict, window_trend: dict | None = None):
+    import altair as alt
+
+    values = trend["total_revenue"]
+    if window_trend and window_trend.get("series"):
+        window_label = st.radio(
+            "Window",
+            list(window_trend["series"].keys()),
+            horizontal=True,
+            key="trend_window",
+            label_visibility="collapsed",
+        )
+        values = window_trend["series"][window_label]
     trend_df = pd.DataFrame(
         {
             "Month": [str(x) for x in trend["months"]],
-            "Total Revenue": [float(x) for x in trend["total_revenue"]],
+            "Total Revenue": [float(x) for x in values],
         }
     )
     chart = (
@@ -446,7 +435,17 @@ def render_trend(trend: dict):
     st.altair_chart(chart, use_container_width=True)
 
 
+def _format_movers(df: pd.DataFrame) -> pd.DataFrame:
+    out = df[["Location", "Previous", "Current", "Delta", "Pct Change"]].copy()
+    for col in ["Previous", "Current", "Delta"]:
+        out[col] = out[col].map(fmt_currency)
+    out["Pct Change"] = out["Pct Change"].map(lambda v: "n/a" if pd.isna(v) else fmt_pct(v))
+    return out
+
+
 def render_revenue_mix(kpis: dict):
+    import altair as alt
+
     mix = kpis["revenue_mix"]
     mix_df = pd.DataFrame(
         {"Category": ["Voice", "SMS", "Data"], "Value": [mix["voice"], mix["sms"], mix["data"]]}
@@ -480,8 +479,9 @@ def render_board_view(model: dict):
     render_kpi_strip(kpis)
     render_mom(mom, mom_label)
 
-    top_10 = kpis["top_10_sites"].copy()
-    bottom_10 = kpis["bottom_10_sites"].copy()
+    # Shared model frames: used as-is (copy-on-write protects them)
+    top_10 = kpis["top_10_sites"]
+    bottom_10 = kpis["bottom_10_sites"]
 
     # Row 1: three cards
     col_m1, col_m2, col_m3 = st.columns(3, gap="large")
@@ -507,15 +507,48 @@ def render_board_view(model: dict):
     with col_t1:
         c = card("Revenue Generation", "Total revenue over time (all available months).", chip="Trend")
         with c:
-            render_trend(model["trend"])
+            render_trend(model["trend"], model.get("window_trend"))
 
     with col_t2:
         c = card("Top 10 Locations", "Ranked table view for board scanning and export.")
         with c:
-            top_display = top_10.copy()
-            top_display["Total"] = top_display["Total"].map(fmt_currency)
+            top_display = top_10.assign(Total=top_10["Total"].map(fmt_currency))
             st.dataframe(top_display, use_container_width=True, height=385)
 
+    deltas = model.get("deltas")
+    calendar = model["calendar"]
+    month_names = calendar.names
+    if deltas is not None and len(month_names) >= 2:
+        c = card("Compare Months", "Total revenue movement between any two reporting months.", chip="MoM / YoY")
+        with c:
+            col_a, col_b = st.columns(2)
+            previous_name = col_a.selectbox(
+                "From", month_names, index=len(month_names) - 2, format_func=calendar.label, key="board_compare_from"
+            )
+            current_name = col_b.selectbox(
+                "To", month_names, index=len(month_names) - 1, format_func=calendar.label, key="board_compare_to"
+            )
+            pair = deltas.compare(current_name, previous_name)
+            st.metric(
+                f"{previous_name} -> {current_name}",
+                fmt_currency(pair["current_total"]),
+                f"{fmt_currency(pair['delta'])} ({pair['pct_change']:.1f}%)",
+            )
+            yoy_name = deltas.same_month_last_year(current_name)
+            if yoy_name:
+                yoy = deltas.compare(current_name, yoy_name)
+                st.caption(f"Same month last year ({yoy_name}): {fmt_currency(yoy['delta'])} ({yoy['pct_change']:.1f}%)")
+
+    rollup = model.get("rollup")
+    if rollup is not None and rollup.has_regions:
+        c = card("Regional Roll-up", "Revenue by region for the reporting month.", chip=f"Month: {latest_name}")
+        with c:
+            region_df = rollup.region_frame(latest_name).sort_values("Total", ascending=False)
+            for col in ["Total", "Voice", "SMS", "Data"]:
+                region_df[col] = region_df[col].map(fmt_currency)
+            region_df["Share %"] = region_df["Share %"].map(fmt_pct)
+            st.dataframe(region_df, use_container_width=True, hide_index=True)
+
     # Bottom insights: full-width cards
     concentration_pct = kpis["concentration_ratio"] * 100.0
     c = card("Risk Indicator", "Revenue concentration in the top 10 sites (higher = more concentration risk).", chip=f"{concentration_pct:.1f}%")
@@ -524,12 +557,21 @@ def render_board_view(model: dict):
         st.progress(min(max(kpis["concentration_ratio"], 0.0), 1.0))
 
     zero_names_display = ", ".join(kpis.get("zero_revenue_locations") or [])
+    anomaly_lines = ""
+    anomalies = model.get("anomalies")
+    if anomalies is not None:
+        persistent = anomalies.persistent_zero_locations(latest_name)
+        drops = anomalies.sudden_drop_locations(latest_name)
+        if persistent:
+            anomaly_lines += f"\n- **Persistent zero revenue:** {len(persistent)} sites have recorded zero revenue for 3+ consecutive months: {', '.join(persistent)}"
+        if drops:
+            anomaly_lines += f"\n- **Sudden drops:** {len(drops)} sites fell sharply against their recent trend: {', '.join(drops)}"
     c = card("Executive Observations & Recommended Actions", "Board-ready talking points derived from the latest month.", chip="Insights")
     with c:
         st.markdown(
             f"""
 - **Top-performing site:** {kpis['top_site']} ({fmt_currency(kpis['top_site_value'])})
-- **Underutilised assets:** {kpis['zero_revenue_sites']} sites recorded **zero revenue** in {latest_name}{(": " + zero_names_display) if zero_names_display else "."}
+- **Underutilised assets:** {kpis['zero_revenue_sites']} sites recorded **zero revenue** in {latest_name}{(": " + zero_names_display) if zero_names_display else "."}{anomaly_lines}
 - **Concentration risk:** Top 10 sites contribute **{concentration_pct:.1f}%** of total revenue.
 - **Recommended action:** Validate zero/low sites, investigate coverage/market constraints, and prioritise data-led uplift plans.
 """
@@ -555,17 +597,9 @@ def render_board_view(model: dict):
     c = card("Board Pack Export", "Generate a one-page board PDF for sharing.", chip="PDF")
     with c:
         if st.button("Export Board PDF", use_container_width=True):
-            filename = f"SINBIP_Board_Report_{latest_name}.pdf"
-            out_path = EXPORT_DIR / filename
-            export_board_pdf(
-                output_path=out_path,
-                title=APP_TITLE,
-                kpis=kpis,
-                mom=mom,
-                sheet22_ctx=sheet22_ctx,
-                trend=model.get("trend"),
-                latest_name=latest_name,
-            )
+            # Rendered once per workbook version (see warmup.py), then served from cache
+            out_path = cached_board_pdf(model)
+            filename = out_path.name
             with open(out_path, "rb") as f:
                 pdf_bytes = f.read()
             st.download_button(
@@ -581,60 +615,228 @@ def render_management_view(model: dict):
     latest_name = model["latest_name"]
     months = model["months"]
     trend_df = model.get("location_trend_df")
+    location_index = model["location_index"]
 
     st.title("SINBIP Management Performance View")
     st.caption(f"Latest month: {latest_name} (management drill-down)")
 
-    month_names = list(months.keys())
-    selected_name = st.selectbox("Select Month", month_names, index=month_names.index(latest_name))
-
-    df = months[selected_name].copy().sort_values("Total", ascending=False)
+    calendar = model["calendar"]
+    month_names = calendar.names
+    selected_name = st.selectbox(
+        "Select Month", month_names, index=calendar.position(latest_name), format_func=calendar.label
+    )
 
-    df["Voice Revenue"] = df[VOICE_COLS].sum(axis=1)
-    df["SMS Revenue"] = df[SMS_COLS].sum(axis=1)
+    df = months[selected_name].sort_values("Total", ascending=False)
 
-    display_df = df[["Location", "Total", "Voice Revenue", "SMS Revenue", "Mobile Data Revenue"]].copy()
-    display_df["Total"] = display_df["Total"].map(fmt_currency)
-    display_df["Voice Revenue"] = display_df["Voice Revenue"].map(fmt_currency)
-    display_df["SMS Revenue"] = display_df["SMS Revenue"].map(fmt_currency)
-    display_df["Mobile Data Revenue"] = display_df["Mobile Data Revenue"].map(fmt_currency)
+    display_df = pd.DataFrame(
+        {
+            "Location": df["Location"],
+            "Total": df["Total"].map(fmt_currency),
+            "Voice Revenue": df[VOICE_COLS].sum(axis=1).map(fmt_currency),
+            "SMS Revenue": df[SMS_COLS].sum(axis=1).map(fmt_currency),
+            "Mobile Data Revenue": df["Mobile Data Revenue"].map(fmt_currency),
+        }
+    )
 
     c = card("Monthly Location Breakdown", "Revenue breakdown by location.", chip=f"Month: {selected_name}")
     with c:
         st.dataframe(display_df, use_container_width=True, height=460)
 
+    deltas = model.get("deltas")
+    previous_name = deltas.previous_month(selected_name) if deltas is not None else None
+    if previous_name:
+        c = card("Location Movers", "Largest revenue gains and declines against the previous month.", chip=f"{previous_name} -> {selected_name}")
+        with c:
+            gainers, decliners = deltas.movers(selected_name, previous_name, n=5)
+            col_up, col_down = st.columns(2, gap="large")
+            with col_up:
+                st.markdown("**Top gainers**")
+                st.dataframe(_format_movers(gainers), use_container_width=True, hide_index=True)
+            with col_down:
+                st.markdown("**Top decliners**")
+                st.dataframe(_format_movers(decliners), use_container_width=True, hide_index=True)
+
+    reconciliation = model.get("reconciliation")
+    if reconciliation is not None:
+        overview = reconciliation.overview()
+        c = card(
+            "Sheet22 Reconciliation",
+            "Monthly sheet totals compared with Sheet22 by location and month.",
+            chip=f"{overview['mismatched']} mismatches",
+        )
+        with c:
+            st.caption(
+                f"{overview['matched']} of {overview['cells']} location-months reconcile across {overview['months']} months."
+            )
+            mismatch_df = reconciliation.mismatches()
+            if mismatch_df.empty:
+                st.success("All location-months reconcile.")
+            else:
+                mismatch_df = mismatch_df.drop(columns=["Sheet22 Column"])
+                for col in ["Monthly Total", "Sheet22 Total", "Difference"]:
+                    mismatch_df[col] = mismatch_df[col].map(lambda v: "-" if pd.isna(v) else fmt_currency(v))
+                st.dataframe(mismatch_df, use_container_width=True, hide_index=True, height=260)
+
     c = card("Location Revenue Sparkline", "Multi-location trend view across months.", chip="Trend")
     with c:
         if trend_df is None or trend_df.empty:
             st.info("No sparkline data available.")
         else:
-            locations = sorted(trend_df["Location"].unique())
-            total_by_loc = trend_df.groupby("Location")["Total"].sum().sort_values(ascending=False)
-            default_locs = [loc for loc in total_by_loc.index[:5] if loc in locations]
+            # Selection kept across filters; the options are the matches plus what is already picked
+            selected = st.session_state.setdefault("sparkline_locations", location_index.default_selection(5))
+            query = st.text_input("Filter locations", placeholder="Name or part of a name", key="sparkline_filter")
+            matches = location_index.search(query)
+            picked = set(selected)
             selected_locs = st.multiselect(
                 "Select locations to plot",
-                options=locations,
-                default=default_locs or locations[:5],
+                options=selected + [name for name in matches if name not in picked],
+                default=selected,
             )
+            st.session_state["sparkline_locations"] = selected_locs
             st.altair_chart(multi_location_chart(trend_df, selected_locs), use_container_width=True)
 
+    render_kpi_export(model)
+    render_query_panel()
+    render_scenario_comparison()
+    render_diagnostics()
+
+
+_EXPORT_FORMATS = {"csv": ("CSV (zip)", "application/zip"),
+                   "xlsx": ("Excel", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+                   "parquet": ("Parquet (zip)", "application/zip")}
+
+
+def render_kpi_export(model: dict):
+    """Management-only download of the KPI tables (see kpi_export.py)."""
+    c = card(
+        "KPI Export",
+        "Monthly summary, location breakdown, MoM deltas and trend tables for offline analysis.",
+        chip="Data",
+    )
+    with c:
+        formats = available_formats()
+        fmt = st.selectbox("Format", formats, format_func=lambda f: _EXPORT_FORMATS[f][0], key="kpi_export_format")
+        if st.button("Prepare KPI Export", use_container_width=True):
+            try:
+                out_path = export_archive(model, fmt)
+            except Exception as e:
+                st.error(f"Failed to export KPIs: {e}")
+                return
+            with open(out_path, "rb") as f:
+                st.download_button(
+                    "Download KPI Export",
+                    data=f.read(),
+                    file_name=out_path.name,
+                    mime=_EXPORT_FORMATS[fmt][1],
+                    use_container_width=True,
+                )
+
+
+def render_query_panel():
+    """Management-only ad-hoc SQL (read-only SELECT) over the ingested months and Sheet22."""
+    with st.expander("SQL Query", expanded=False):
+        store = get_query_store()
+        if store is None:
+            st.caption("No monthly data loaded.")
+            return
+        st.caption("Tables: " + "; ".join(f"{t} ({', '.join(cols)})" for t, cols in store.tables().items()))
+        example = st.selectbox("Example", list(EXAMPLE_QUERIES), key="query_example")
+        sql = st.text_area("SELECT query", value=EXAMPLE_QUERIES[example], height=180, key=f"query_sql_{example}")
+        if st.button("Run Query", use_container_width=True):
+            try:
+                result = store.query(sql)
+            except QueryError as e:
+                st.error(str(e))
+                return
+            note = f" (first {len(result.frame):,} shown)" if result.truncated else ""
+            st.caption(f"{len(result.frame):,} rows in {result.seconds * 1000:.1f} ms{note}")
+            st.dataframe(result.frame, use_container_width=True, hide_index=True)
+
+
+def render_scenario_comparison():
+    """Management-only comparison of two workbook versions or scenarios."""
+    workbooks = available_workbooks()
+    if len(workbooks) < 2:
+        return
+    c = card("Scenario Comparison", "Differences between two workbook versions by location, month and stream.", chip="Workbooks")
+    with c:
+        names = [p.name for p in workbooks]
+        default_base = names.index(PRIMARY_EXCEL.name) if PRIMARY_EXCEL.name in names else 0
+        col_a, col_b = st.columns(2)
+        base_name = col_a.selectbox("Base workbook", names, index=default_base, key="scenario_base")
+        other_name = col_b.selectbox(
+            "Compare with", names, index=1 if default_base == 0 else 0, key="scenario_other"
+        )
+        if base_name == other_name:
+            st.info("Select two different workbooks to compare.")
+            return
+        try:
+            comparison = compare_workbooks(
+                [workbooks[names.index(base_name)], workbooks[names.index(other_name)]],
+                labels=[base_name, other_name],
+            )
+        except Exception as e:
+            st.error(f"Failed to compare workbooks: {e}")
+            return
+
+        summary = comparison.month_summary(other_name, base_name)
+        summary = summary[summary["Changed Sites"] > 0]
+        if summary.empty:
+            st.success("The workbooks contain identical revenue figures.")
+            return
+        summary["Month"] = summary["Month"].map(comparison.calendar.label)
+        for col in summary.columns:
+            if col not in ("Month", "Changed Sites"):
+                summary[col] = summary[col].map(fmt_currency)
+        st.dataframe(summary, use_container_width=True, hide_index=True)
+
+        diffs = comparison.location_diffs(other_name, base_name)
+        for col in ["Total Difference", "Voice Difference", "SMS Difference", "Data Difference"]:
+            diffs[col] = diffs[col].map(fmt_currency)
+        st.dataframe(diffs, use_container_width=True, hide_index=True, height=260)
+
+
+def render_diagnostics():
+    """Collapsed, management-only panel with per-stage timings of the last model load."""
+    with st.expander("Diagnostics", expanded=False):
+        spans = last_run("get_model") or last_run("build_model")
+        if not spans:
+            st.caption("No model load recorded in this server process yet.")
+            return
+        root_depth = spans[0]["depth"]
+        total = spans[0]["seconds"]
+        stages = {s["stage"] for s in spans}
+        source = ("built from the workbook" if "build_model" in stages
+                  else "shared model" if "load_shared_model" in stages else "disk cache")
+        st.caption(f"Last model load ({source}): {total:.2f}s across {len(spans)} spans")
+        cols = ["stage", "depth", "seconds", "rows", "sheet", "header_attempts", "hit", "memory_delta_mb"]
+        diag_df = pd.DataFrame(spans).reindex(columns=cols)
+        diag_df["stage"] = ["  " * int(d - root_depth) + str(name) for name, d in zip(diag_df["stage"], diag_df["depth"])]
+        st.dataframe(diag_df.drop(columns=["depth"]), use_container_width=True, hide_index=True)
+        reruns = [s for s in recent_spans() if s["stage"] == "load_model"][-20:]
+        if reruns:
+            st.caption(f"load_model over the last {len(reruns)} reruns: "
+                       f"max {max(s['seconds'] for s in reruns) * 1000:.1f} ms")
+
 
 # -----------------------------
 # App
 # -----------------------------
 def main():
     inject_board_css()
-    _enable_board_theme()
 
     if "user" not in st.session_state:
         _set_user(None)
 
     user = _get_user()
     if not user:
+        # Parse the workbook while the user is typing credentials
+        prefetch_model()
         render_login()
         return
 
     render_user_menu(user)
+    _enable_board_theme()
 
     model = load_model()
     if model is None:
@@ -0,0 +1,276 @@
+import pickle
+import sqlite3
+import threading
+import warnings
+from dataclasses import fields, is_dataclass
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from anomaly_service import build_anomaly_table
+from config import PRIMARY_EXCEL, DISK_CACHE, SHARED_MODEL
+from data_loader import load_all_months, load_sheet22, load_region_map
+from diagnostics import span
+from kpi_service import calculate_kpis, build_month_deltas, build_window_aggregates, build_window_trend, trend_from_kpis
+from location_index import build_location_index
+from location_matrix import build_location_matrix
+from reconciliation_service import build_reconciliation
+from result_cache import default_cache, model_key
+from rollup_service import build_rollup_cube
+from sheet22_service import build_sheet22_context, build_sheet22_series
+from sparkline import build_location_trend_frame
+from utils import build_calendar_index
+
+_LOCK = threading.Lock()
+_CACHE: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+# One build lock per workbook path, so different workbooks can load concurrently
+_PATH_LOCKS: Dict[str, threading.Lock] = {}
+_PREFETCHING: set = set()
+
+
+def _workbook_key(path: Path) -> Tuple[str, int, int]:
+    stat = Path(path).stat()
+    return (str(Path(path).resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def build_model(path: Path = PRIMARY_EXCEL) -> Optional[Dict[str, Any]]:
+    """
+    Parse the workbook and precompute everything the views need.
+    Returns None when the workbook has no monthly sheets.
+    Every stage is recorded as a diagnostics span under the "build_model" run.
+    """
+    with span("build_model", path=str(path)):
+        return _build_model(path)
+
+
+def _build_model(path: Path) -> Optional[Dict[str, Any]]:
+    with span("load_all_months") as rec:
+        months_raw = load_all_months(path)  # dict: {sheet_name: df}
+        rec["sheets"] = len(months_raw)
+        rec["rows"] = sum(len(df) for df in months_raw.values())
+    if not months_raw:
+        return None
+
+    calendar = build_calendar_index(months_raw.keys())
+    months = {name: months_raw[name] for name in calendar.names}
+
+    latest_name = calendar.latest
+    latest_df = months[latest_name]
+    with span("calculate_kpis", rows=sum(len(df) for df in months.values())):
+        # Every month up front: the model is cached, so month views and the API never recompute
+        kpis_by_month = {name: calculate_kpis(df) for name, df in months.items()}
+    latest_kpis = kpis_by_month[latest_name]
+
+    with span("build_location_matrix") as rec:
+        matrix = build_location_matrix(months)
+        rec["rows"] = matrix.shape[0]
+    with span("build_month_deltas"):
+        deltas = build_month_deltas(matrix, calendar)
+
+    mom = None
+    mom_label = None
+    prev_name = calendar.previous(latest_name)
+    if prev_name:
+        mom = deltas.mom(latest_name)
+        mom_label = f"MoM compares {prev_name} -> {latest_name}"
+
+    with span("build_anomaly_table"):
+        anomalies = build_anomaly_table(matrix)
+    with span("build_rollup_cube"):
+        rollup = build_rollup_cube(matrix, load_region_map(path))
+    with span("build_trend_series"):
+        trend = trend_from_kpis(kpis_by_month)
+    with span("build_window_aggregates"):
+        windows = build_window_aggregates(matrix)
+        window_trend = build_window_trend(windows)
+
+    with span("load_sheet22") as rec:
+        sheet22_df = load_sheet22(path)
+        rec["rows"] = len(sheet22_df)
+    with span("build_sheet22_context"):
+        sheet22_ctx = build_sheet22_context(sheet22_df)
+    with span("build_sheet22_series"):
+        sheet22_series = build_sheet22_series(sheet22_df, month_periods=matrix.periods)
+    with span("build_reconciliation"):
+        reconciliation = build_reconciliation(matrix, sheet22_series)
+    with span("build_location_trend_frame") as rec:
+        month_axis = dict(zip(sheet22_series.columns, sheet22_series.periods.to_pydatetime())) if sheet22_series else None
+        location_trend_df = build_location_trend_frame(sheet22_df, month_axis)
+        rec["rows"] = len(location_trend_df)
+    with span("build_location_index"):
+        location_index = build_location_index(location_trend_df)
+
+    return {
+        "months": months,
+        "calendar": calendar,
+        "latest_name": latest_name,
+        "latest_df": latest_df,
+        "latest_kpis": latest_kpis,
+        "kpis_by_month": kpis_by_month,
+        "mom": mom,
+        "mom_label": mom_label,
+        "matrix": matrix,
+        "deltas": deltas,
+        "anomalies": anomalies,
+        "rollup": rollup,
+        "trend": trend,
+        "windows": windows,
+        "window_trend": window_trend,
+        "sheet22_ctx": sheet22_ctx,
+        "sheet22_series": sheet22_series,
+        "reconciliation": reconciliation,
+        "location_trend_df": location_trend_df,
+        "location_index": location_index,
+    }
+
+
+def _freeze(obj: Any, seen: set) -> None:
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        obj.setflags(write=False)
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _freeze(value, seen)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            _freeze(value, seen)
+    elif is_dataclass(obj) and not isinstance(obj, type):
+        for f in fields(obj):
+            _freeze(getattr(obj, f.name), seen)
+
+
+def freeze_model(model: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Mark every numpy array in the model read-only (matrices, deltas, prefix sums, ...),
+    so the one process-wide copy can be handed to every session as zero-copy views.
+    DataFrames and Series are shared under pandas copy-on-write (enabled in main):
+    derive new frames from them (assign, filters, any non-inplace operation), never
+    write into a model frame in place.
+    """
+    if model is not None:
+        _freeze(model, set())
+    return model
+
+
+def load_or_build_model(path: Path = PRIMARY_EXCEL, use_disk: bool = DISK_CACHE) -> Optional[Dict[str, Any]]:
+    """
+    Model from the persistent disk cache when the workbook content and code are
+    unchanged, otherwise built and written back. Cache failures fall back to a build.
+    """
+    if SHARED_MODEL:
+        if find_spec("pyarrow") is not None:
+            return _load_or_build_shared(path)
+        warnings.warn("SINBIP_SHARED_MODEL needs pyarrow (pip install -r requirements.txt); "
+                      "using the disk cache instead", RuntimeWarning, stacklevel=2)
+    if not use_disk:
+        return build_model(path)
+
+    try:
+        with span("disk_cache_get") as rec:
+            cache = default_cache()
+            key = model_key(path)
+            model = cache.get(key)
+            rec["hit"] = model is not None
+        if model is not None:
+            return model
+    except (OSError, sqlite3.Error):
+        return build_model(path)
+
+    model = build_model(path)
+    if model is not None:
+        try:
+            with span("disk_cache_put") as rec:
+                rec["bytes"] = cache.put(key, model)
+        except (OSError, sqlite3.Error, pickle.PicklingError):
+            pass
+    return model
+
+
+def _load_or_build_shared(path: Path) -> Optional[Dict[str, Any]]:
+    # One memory-mapped copy per workbook version for every server process on the host
+    import pyarrow as pa
+    from shared_model import load_shared_model, read_shared_model, shared_model_path, write_shared_model
+
+    key = model_key(path)
+    with span("load_shared_model") as rec:
+        model = load_shared_model(key)
+        rec["hit"] = model is not None
+    if model is not None:
+        return model
+
+    model = build_model(path)
+    if model is None:
+        return None
+    try:
+        with span("write_shared_model"):
+            shared = write_shared_model(model, shared_model_path(key))
+        # Serve from the mapping too, so this process does not keep a private copy
+        return read_shared_model(shared)
+    except (OSError, pa.ArrowException, pickle.PicklingError):
+        return model
+
+
+def get_model(path: Path = PRIMARY_EXCEL) -> Optional[Dict[str, Any]]:
+    """
+    Process-wide cached, read-only model shared by every session. Rebuilt only when
+    the workbook changes on disk (path, mtime and size form the key), so Streamlit reruns reuse it.
+    A new process first tries the persistent disk cache (see load_or_build_model).
+    """
+    key = _workbook_key(path)
+    with _LOCK:
+        if key in _CACHE:
+            return _CACHE[key]
+        path_lock = _PATH_LOCKS.setdefault(key[0], threading.Lock())
+
+    with path_lock:
+        with _LOCK:
+            if key in _CACHE:
+                return _CACHE[key]
+        # Recorded whether the model is built or read from a cache (the diagnostics panel's run)
+        with span("get_model", path=str(path)):
+            model = freeze_model(load_or_build_model(path))
+        with _LOCK:
+            # Drop stale entries for the same workbook path
+            for old in [k for k in _CACHE if k[0] == key[0]]:
+                del _CACHE[old]
+            _CACHE[key] = model
+    return model
+
+
+def prefetch_model(path: Path = PRIMARY_EXCEL) -> Optional[threading.Thread]:
+    """
+    Start building the model on a background thread (e.g. while the login page is
+    shown). A later get_model for the same workbook waits on that build instead of
+    starting its own. Returns None when the model is already cached or loading.
+    """
+    try:
+        key = _workbook_key(path)
+    except OSError:
+        return None
+    with _LOCK:
+        if key in _CACHE or key in _PREFETCHING:
+            return None
+        _PREFETCHING.add(key)
+
+    def _run() -> None:
+        try:
+            get_model(path)
+        except Exception:
+            # Surfaced by the foreground load_model call instead
+            pass
+        finally:
+            with _LOCK:
+                _PREFETCHING.discard(key)
+
+    thread = threading.Thread(target=_run, name="sinbip-prefetch", daemon=True)
+    thread.start()
+    return thread
+
+
+def clear_model_cache() -> None:
+    with _LOCK:
+        _CACHE.clear()
@@ -0,0 +1,75 @@
+"""
+Benchmark for the board PDF's all-locations appendix.
+
+Usage:
+  python pdf_benchmark.py --rows 1000,10000,50000
+  python pdf_benchmark.py --rows 1000,10000 --compare
+
+Renders an appendix of N synthetic location rows with the streamed, page-sized
+tables (pdf_export.AppendixFeed) and reports wall time, pages, pages/sec and
+peak Python memory (tracemalloc, separate pass). --compare also renders the
+same rows as one splittable Table, the way the top/bottom-10 tables are built.
+"""
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterator
+
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Table
+
+from benchmark import measure
+from pdf_export import APPENDIX_HEADER, AppendixFeed, APPENDIX_STYLE
+
+
+def synthetic_rows(n: int) -> Iterator[list]:
+    for i in range(n):
+        total = 1000.0 + (i * 7919) % 50000
+        yield [f"NBIP_SITE_{i:06d}", f"${total:,.2f}", f"${total * 0.3:,.2f}", f"${total * 0.1:,.2f}",
+               f"${total * 0.6:,.2f}", f"{(i % 41) - 20:.1f}%"]
+
+
+def _render(path: Path, n: int, streamed: bool) -> int:
+    doc = SimpleDocTemplate(str(path), pagesize=A4)
+    if streamed:
+        story = [AppendixFeed(synthetic_rows(n))]
+    else:
+        table = Table([APPENDIX_HEADER] + list(synthetic_rows(n)), repeatRows=1)
+        table.setStyle(APPENDIX_STYLE)
+        story = [table]
+    doc.build(story)
+    return doc.page
+
+
+def run_appendix_benchmark(rows: list[int], compare: bool = False,
+                           trace_memory: bool = True) -> Dict[str, Dict[str, float]]:
+    out_dir = Path(tempfile.mkdtemp(prefix="sinbip_pdf_"))
+    results = {}
+    modes = [("streamed", True)] + ([("single_table", False)] if compare else [])
+    for n in rows:
+        for mode, streamed in modes:
+            pages, stats = measure(lambda: _render(out_dir / f"{mode}_{n}.pdf", n, streamed),
+                                   trace_memory=trace_memory)
+            stats["pages"] = pages
+            stats["pages_per_sec"] = pages / stats["seconds"] if stats["seconds"] else 0.0
+            results[f"{mode}[{n}]"] = stats
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the board PDF location appendix.")
+    parser.add_argument("--rows", default="1000,10000,50000", help="Comma-separated row counts")
+    parser.add_argument("--compare", action="store_true", help="Also render each size as one Table")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    args = parser.parse_args()
+
+    rows = [int(x) for x in args.rows.split(",") if x.strip()]
+    results = run_appendix_benchmark(rows, compare=args.compare, trace_memory=not args.no_memory)
+    print(f"{'appendix':<24}{'seconds':>10}{'pages':>8}{'pages/s':>10}{'peak MB':>10}")
+    for name, stats in results.items():
+        print(f"{name:<24}{stats['seconds']:>10.3f}{stats['pages']:>8}{stats['pages_per_sec']:>10.1f}"
+              f"{stats['peak_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Iterable, Iterator, Optional
 
 from reportlab.graphics.charts.barcharts import HorizontalBarChart
 from reportlab.graphics.charts.lineplots import LinePlot
@@ -7,10 +8,23 @@ from reportlab.graphics.shapes import Drawing, String
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import Paragraph, Spacer, Table, TableStyle, SimpleDocTemplate
+from reportlab.platypus import Flowable, PageBreak, Paragraph, Spacer, Table, TableStyle, SimpleDocTemplate
 
 from utils import fmt_currency, fmt_pct
 
+APPENDIX_HEADER = ["Location", "Total", "Voice", "SMS", "Data", "MoM Change"]
+_APPENDIX_ROW_HEIGHT = 13
+APPENDIX_STYLE = TableStyle([
+    ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+    ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+    ("FONTSIZE", (0, 0), (-1, -1), 7.5),
+    ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+    ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ("LINEBELOW", (0, 0), (-1, -1), 0.25, colors.grey),
+    ("TOPPADDING", (0, 0), (-1, -1), 1),
+    ("BOTTOMPADDING", (0, 0), (-1, -1), 1),
+])
+
 
 def _plot_revenue_mix(kpis: dict) -> Drawing:
     mix = kpis.get("revenue_mix", {})
@@ -32,7 +46,7 @@ def _plot_revenue_mix(kpis: dict) -> Drawing:
 
 
 def _plot_top_sites(df, title: str) -> Drawing:
-    data = df.copy()
+    data = df
     drawing = Drawing(460, 260)
     chart = HorizontalBarChart()
     chart.x = 30
@@ -70,6 +84,74 @@ def _plot_trend(trend: dict) -> Drawing:
     return drawing
 
 
+def appendix_rows(matrix, month: str, previous: Optional[str] = None) -> Iterator[list]:
+    """Formatted appendix rows for every location in `month` (location order), one at a time."""
+    j = matrix.month_pos(month)
+    k = matrix.month_pos(previous) if previous else None
+    totals = matrix.values["total"]
+    for i, location in enumerate(matrix.locations):
+        if not matrix.present[i, j]:
+            continue
+        row = [str(location)] + [fmt_currency(float(matrix.values[s][i, j])) for s in ("total", "voice", "sms", "data")]
+        if k is not None and totals[i, k]:
+            row.append(fmt_pct((totals[i, j] - totals[i, k]) / totals[i, k] * 100.0))
+        else:
+            row.append("n/a")
+        yield row
+
+
+class AppendixFeed(Flowable):
+    """
+    Streams appendix rows into the document one page-sized table at a time.
+
+    It never fits a frame, so the layout engine asks it to split; each split takes
+    only the rows that fit the remaining space (fixed row height) from the iterator
+    and returns that table, with its own header, followed by a new feed for the rest.
+    Only the current page's rows are ever held as flowables, whatever the number of
+    locations; what grows with size is the canvas's finished page streams (written at save).
+    """
+
+    def __init__(self, rows: Iterable[list], header: list = APPENDIX_HEADER, col_widths: Optional[list] = None):
+        super().__init__()
+        self._rows = iter(rows)
+        self._header = header
+        self._col_widths = col_widths
+        self._next = next(self._rows, None)
+
+    def wrap(self, availWidth, availHeight):
+        if self._next is None:
+            return availWidth, 0  # no rows (left): nothing to place
+        return availWidth, availHeight + 1
+
+    def split(self, availWidth, availHeight):
+        if self._next is None:
+            return []
+        fits = int((availHeight - 0.01) // _APPENDIX_ROW_HEIGHT) - 1
+        if fits < 1:
+            return []
+        chunk = [self._next]
+        for row in self._rows:
+            chunk.append(row)
+            if len(chunk) == fits:
+                break
+        self._next = next(self._rows, None)
+
+        n = len(self._header)
+        widths = self._col_widths or [availWidth * 0.3] + [availWidth * 0.7 / (n - 1)] * (n - 1)
+        table = Table([self._header] + chunk, colWidths=widths, rowHeights=_APPENDIX_ROW_HEIGHT,
+                      repeatRows=1, splitByRow=1)
+        table.setStyle(APPENDIX_STYLE)
+        if self._next is None:
+            return [table]
+        # A fresh feed: the layout engine marks a flowable that did not fit once as postponed
+        rest = AppendixFeed((), self._header, self._col_widths)
+        rest._rows, rest._next = self._rows, self._next
+        return [table, rest]
+
+    def draw(self):
+        pass
+
+
 def export_board_pdf(
     output_path: Path,
     title: str,
@@ -78,7 +160,14 @@ def export_board_pdf(
     sheet22_ctx: dict,
     trend: dict | None = None,
     latest_name: str | None = None,
+    reconciliation=None,
+    appendix: Optional[Iterable[list]] = None,
+    appendix_title: str = "Appendix - All Locations",
 ) -> Path:
+    """
+    Build the board report. `appendix` (rows as produced by appendix_rows) adds a
+    full location table after the observations, streamed page by page (AppendixFeed).
+    """
     styles = getSampleStyleSheet()
     doc = SimpleDocTemplate(str(output_path), pagesize=A4)
 
@@ -192,12 +281,27 @@ def export_board_pdf(
         styles["Normal"],
     ))
 
-    if sheet22_ctx.get("control_total") is not None:
+    if reconciliation is not None:
+        overview = reconciliation.overview()
+        story.append(Spacer(1, 10))
+        story.append(Paragraph(
+            f"Control Note (Sheet22): {overview['matched']} of {overview['cells']} location-months across "
+            f"{overview['months']} months reconcile with the monthly sheets; {overview['mismatched']} differ "
+            f"(total absolute difference {fmt_currency(overview['abs_difference'])}).",
+            styles["Italic"],
+        ))
+    elif sheet22_ctx.get("control_total") is not None:
         story.append(Spacer(1, 10))
         story.append(Paragraph(
             "Control Note (Sheet22): A control total was detected and can be used for internal reconciliation.",
             styles["Italic"],
         ))
 
+    if appendix is not None:
+        story.append(PageBreak())
+        story.append(Paragraph(appendix_title, styles["Heading2"]))
+        story.append(Spacer(1, 6))
+        story.append(AppendixFeed(appendix))
+
     doc.build(story)
     return output_path
@@ -0,0 +1,208 @@
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from config import PRIMARY_EXCEL
+from model_store import get_model
+from utils import month_ordinal
+
+MAX_ROWS = 5_000
+QUERY_TIMEOUT = 5.0  # seconds
+
+SCHEMA = """
+CREATE TABLE months (
+    month TEXT PRIMARY KEY, label TEXT, period TEXT, ordinal INTEGER, position INTEGER
+);
+CREATE TABLE month_facts (
+    location TEXT NOT NULL, month TEXT NOT NULL, period TEXT, ordinal INTEGER, position INTEGER,
+    total REAL, voice REAL, sms REAL, data REAL,
+    mom_delta REAL, mom_pct REAL, yoy_delta REAL, yoy_pct REAL
+);
+CREATE TABLE sheet22 (
+    location TEXT NOT NULL, column TEXT, month TEXT, period TEXT, ordinal INTEGER, value REAL
+);
+CREATE INDEX month_facts_location ON month_facts (location, ordinal);
+CREATE INDEX month_facts_month ON month_facts (month);
+CREATE INDEX month_facts_ordinal ON month_facts (ordinal);
+CREATE INDEX sheet22_location ON sheet22 (location, ordinal);
+CREATE INDEX sheet22_ordinal ON sheet22 (ordinal);
+"""
+
+EXAMPLE_QUERIES = {
+    "Latest month, top 10 sites": """SELECT location, total, voice, sms, data, mom_pct
+FROM month_facts
+WHERE month = (SELECT month FROM months ORDER BY position DESC LIMIT 1)
+ORDER BY total DESC
+LIMIT 10""",
+    "Data revenue up >20% three months running": """WITH growth AS (
+    SELECT location, month, ordinal, data,
+           CASE WHEN ordinal - LAG(ordinal) OVER w = 1
+                THEN data / NULLIF(LAG(data) OVER w, 0) - 1 END AS data_growth
+    FROM month_facts
+    WHERE ordinal IS NOT NULL
+    WINDOW w AS (PARTITION BY location ORDER BY ordinal)
+), streaks AS (
+    SELECT location, month, ordinal, data, data_growth,
+           MIN(data_growth) OVER (PARTITION BY location ORDER BY ordinal ROWS 2 PRECEDING) AS worst_of_3,
+           COUNT(data_growth) OVER (PARTITION BY location ORDER BY ordinal ROWS 2 PRECEDING) AS months_in_run
+    FROM growth
+)
+SELECT location, month, data, data_growth, worst_of_3
+FROM streaks
+WHERE months_in_run = 3 AND worst_of_3 > 0.20
+ORDER BY location, ordinal""",
+    "Sites below Sheet22 in any month": """SELECT f.location, f.month, f.total, s.value AS sheet22_value,
+       f.total - s.value AS difference
+FROM month_facts f
+JOIN sheet22 s ON s.location = f.location AND s.ordinal = f.ordinal
+WHERE f.total < s.value - 0.01
+ORDER BY difference""",
+}
+
+# Actions a user query may perform (anything else, including PRAGMA and ATTACH, is denied)
+_ALLOWED_ACTIONS = {sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE}
+
+
+class QueryError(ValueError):
+    """A query was rejected or failed; the message is safe to show to the user."""
+
+
+@dataclass(frozen=True)
+class QueryResult:
+    frame: pd.DataFrame
+    truncated: bool
+    seconds: float
+
+
+def _authorize(action: int, *_args) -> int:
+    return sqlite3.SQLITE_OK if action in _ALLOWED_ACTIONS else sqlite3.SQLITE_DENY
+
+
+class QueryStore:
+    """
+    In-process SQLite database over one workbook's model, built once and then read-only.
+    Tables: months, month_facts (one row per location and month sheet) and sheet22
+    (one row per non-blank Sheet22 cell), indexed on location and month.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+        self._lock = threading.Lock()
+        conn.set_authorizer(_authorize)
+
+    def tables(self) -> Dict[str, list]:
+        """Column names per table, for display."""
+        out = {}
+        for table in ("months", "month_facts", "sheet22"):
+            out[table] = self.query(f"SELECT * FROM {table} LIMIT 0").frame.columns.tolist()
+        return out
+
+    def query(self, sql: str, params: Sequence[Any] = (), max_rows: int = MAX_ROWS,
+              timeout: float = QUERY_TIMEOUT) -> QueryResult:
+        """Run one read-only SELECT; at most max_rows rows are returned (truncated is set beyond that)."""
+        if not sql.strip():
+            raise QueryError("Enter a SELECT query.")
+        deadline = time.perf_counter() + timeout
+        with self._lock:
+            self._conn.set_progress_handler(lambda: time.perf_counter() > deadline, 10_000)
+            t0 = time.perf_counter()
+            try:
+                cursor = self._conn.execute(sql, tuple(params))
+                rows = cursor.fetchmany(max_rows + 1)
+                columns = [d[0] for d in cursor.description or ()]
+                cursor.close()
+            except sqlite3.DatabaseError as e:
+                message = str(e)
+                if time.perf_counter() > deadline:
+                    message = f"Query exceeded {timeout:.0f}s and was stopped."
+                elif "not authorized" in message:
+                    message = "Only read-only SELECT queries are allowed."
+                raise QueryError(message) from None
+            except (sqlite3.Warning, sqlite3.ProgrammingError) as e:
+                raise QueryError(str(e)) from None
+            finally:
+                self._conn.set_progress_handler(None, 0)
+            seconds = time.perf_counter() - t0
+        truncated = len(rows) > max_rows
+        frame = pd.DataFrame.from_records(rows[:max_rows], columns=columns)
+        return QueryResult(frame=frame, truncated=truncated, seconds=seconds)
+
+
+def _none_if_nan(values: np.ndarray) -> list:
+    return [None if v != v else float(v) for v in values.tolist()]
+
+
+def build_query_store(model: Dict[str, Any]) -> QueryStore:
+    """Load the model's months, location matrix, deltas and Sheet22 series into a new in-memory database."""
+    matrix = model["matrix"]
+    calendar = model["calendar"]
+    deltas = model["deltas"]
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    conn.executescript(SCHEMA)
+
+    periods = [f"{p:%Y-%m}" if p else None for p in matrix.periods]
+    ordinals = [calendar.ordinal(m) if m in calendar else None for m in matrix.months]
+    conn.executemany(
+        "INSERT INTO months VALUES (?, ?, ?, ?, ?)",
+        [(m, calendar.label(m), periods[j], ordinals[j], j) for j, m in enumerate(matrix.months)],
+    )
+
+    rows, cols = np.nonzero(matrix.present)
+    locations = matrix.locations.to_numpy()[rows].tolist()
+    cols_list = cols.tolist()
+    columns = [
+        locations,
+        [matrix.months[j] for j in cols_list],
+        [periods[j] for j in cols_list],
+        [ordinals[j] for j in cols_list],
+        cols_list,
+    ]
+    columns += [matrix.values[s][rows, cols].tolist() for s in ("total", "voice", "sms", "data")]
+    for a in (deltas.mom_delta, deltas.mom_pct, deltas.yoy_delta, deltas.yoy_pct):
+        columns.append(_none_if_nan(a[rows, cols]))
+    conn.executemany("INSERT INTO month_facts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", zip(*columns))
+
+    series = model.get("sheet22_series")
+    if series is not None and series.values.size:
+        r, c = np.nonzero(~np.isnan(series.values))
+        s_periods = series.periods.to_pydatetime()
+        s_ordinals = [month_ordinal(p) for p in s_periods]
+        conn.executemany(
+            "INSERT INTO sheet22 VALUES (?, ?, ?, ?, ?, ?)",
+            zip(
+                series.locations.to_numpy()[r].tolist(),
+                [series.columns[j] for j in c.tolist()],
+                [calendar.name_for_ordinal(s_ordinals[j]) for j in c.tolist()],
+                [f"{s_periods[j]:%Y-%m}" for j in c.tolist()],
+                [s_ordinals[j] for j in c.tolist()],
+                series.values[r, c].tolist(),
+            ),
+        )
+    conn.commit()
+    conn.execute("ANALYZE")
+    return QueryStore(conn)
+
+
+_LOCK = threading.Lock()
+# workbook path -> (model it was built from, store); rebuilt when the model is. The model
+# itself is held (not its id, which can be reused once the old model is collected)
+_STORES: Dict[str, Tuple[Dict[str, Any], QueryStore]] = {}
+
+
+def get_query_store(path: Path = PRIMARY_EXCEL) -> Optional[QueryStore]:
+    """Process-wide store for the workbook's current model (None if it has no month sheets)."""
+    model = get_model(path)
+    if model is None:
+        return None
+    key = str(Path(path).resolve())
+    with _LOCK:
+        cached = _STORES.get(key)
+        if cached is None or cached[0] is not model:
+            _STORES[key] = (model, build_query_store(model))
+        return _STORES[key][1]
@@ -0,0 +1,131 @@
+from dataclasses import dataclass
+from functools import cached_property
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from location_matrix import LocationMatrix
+from sheet22_service import Sheet22Series
+
+TOLERANCE = 0.01
+
+STATUS_MATCH = "match"
+STATUS_MISMATCH = "mismatch"
+STATUS_MISSING_SHEET22 = "missing in Sheet22"
+STATUS_MISSING_MONTHLY = "missing in monthly sheet"
+
+
+@dataclass(frozen=True)
+class ReconciliationReport:
+    """
+    Monthly sheet totals vs Sheet22 values on a shared (location x month) grid.
+    - locations: union of locations from both sources (sorted)
+    - months: month sheet names that have a matching Sheet22 column
+    - sheet22_columns: the Sheet22 column for each month
+    - monthly / sheet22: (L, K) values, NaN where the source has no row
+      (a missing row only counts as a mismatch when the other side is non-zero)
+    - control_totals: Sheet22 "Total" row per month (NaN if absent)
+    """
+    locations: pd.Index
+    months: List[str]
+    sheet22_columns: List[str]
+    monthly: np.ndarray
+    sheet22: np.ndarray
+    control_totals: np.ndarray
+    tolerance: float = TOLERANCE
+
+    @cached_property
+    def difference(self) -> np.ndarray:
+        # A side without a row counts as zero revenue
+        return np.nan_to_num(self.monthly) - np.nan_to_num(self.sheet22)
+
+    @cached_property
+    def status(self) -> np.ndarray:
+        monthly_missing = np.isnan(self.monthly)
+        sheet22_missing = np.isnan(self.sheet22)
+        differs = np.abs(self.difference) > self.tolerance
+        out = np.where(differs, STATUS_MISMATCH, STATUS_MATCH).astype(object)
+        out[differs & sheet22_missing] = STATUS_MISSING_SHEET22
+        out[differs & monthly_missing] = STATUS_MISSING_MONTHLY
+        return out
+
+    def frame(self) -> pd.DataFrame:
+        """Long table: Location, Month, Sheet22 Column, Monthly Total, Sheet22 Total, Difference, Status"""
+        n_loc, n_month = self.monthly.shape
+        return pd.DataFrame(
+            {
+                "Location": np.repeat(self.locations.to_numpy(), n_month),
+                "Month": np.tile(np.asarray(self.months, dtype=object), n_loc),
+                "Sheet22 Column": np.tile(np.asarray(self.sheet22_columns, dtype=object), n_loc),
+                "Monthly Total": self.monthly.ravel(),
+                "Sheet22 Total": self.sheet22.ravel(),
+                "Difference": self.difference.ravel(),
+                "Status": self.status.ravel(),
+            }
+        )
+
+    def mismatches(self) -> pd.DataFrame:
+        df = self.frame()
+        out = df[df["Status"] != STATUS_MATCH]
+        return out.reindex(out["Difference"].abs().sort_values(ascending=False).index).reset_index(drop=True)
+
+    def summary(self) -> pd.DataFrame:
+        """Per month: Month, Monthly Total, Sheet22 Total, Control Total, Difference, Mismatched Sites"""
+        status = self.status
+        monthly_total = np.nansum(self.monthly, axis=0)
+        sheet22_total = np.nansum(self.sheet22, axis=0)
+        return pd.DataFrame(
+            {
+                "Month": self.months,
+                "Monthly Total": monthly_total,
+                "Sheet22 Total": sheet22_total,
+                "Control Total": self.control_totals,
+                "Difference": monthly_total - sheet22_total,
+                "Mismatched Sites": (status != STATUS_MATCH).sum(axis=0),
+            }
+        )
+
+    def overview(self) -> dict:
+        status = self.status
+        return {
+            "cells": int(status.size),
+            "matched": int((status == STATUS_MATCH).sum()),
+            "mismatched": int((status != STATUS_MATCH).sum()),
+            "months": len(self.months),
+            "abs_difference": float(np.abs(self.difference).sum()),
+        }
+
+
+def build_reconciliation(
+    matrix: LocationMatrix,
+    series: Optional[Sheet22Series],
+    tolerance: float = TOLERANCE,
+) -> Optional[ReconciliationReport]:
+    """
+    Join Sheet22 with the monthly sheets on the shared calendar axis and
+    location index in one reindex; returns None when no month overlaps.
+    """
+    if series is None:
+        return None
+
+    s22_pos = {p.to_pydatetime(): j for j, p in enumerate(series.periods)}
+    month_pos = [j for j, p in enumerate(matrix.periods) if p is not None and p in s22_pos]
+    if not month_pos:
+        return None
+    periods = [matrix.periods[j] for j in month_pos]
+
+    locations = matrix.locations.union(series.locations).rename("Location")
+    monthly = matrix.frame("total").iloc[:, month_pos]
+    monthly = monthly.where(matrix.present[:, month_pos])
+    monthly = monthly.reindex(locations).to_numpy(dtype=float)
+
+    return ReconciliationReport(
+        locations=locations,
+        months=[matrix.months[j] for j in month_pos],
+        sheet22_columns=[series.columns[s22_pos[p]] for p in periods],
+        monthly=monthly,
+        sheet22=series.align(locations, periods),
+        control_totals=np.array([series.control_totals[s22_pos[p]] for p in periods], dtype=float),
+        tolerance=tolerance,
+    )
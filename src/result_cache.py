@@ -0,0 +1,165 @@
+"""
+Persistent on-disk cache for built dashboard models.
+
+Entries live in one SQLite file under CACHE_DIR, keyed by the workbook's
+content hash plus a code version (hash of the src/*.py sources) and the
+settings that change the model. Payloads are zlib-compressed pickles.
+Total payload size is bounded by CACHE_MAX_MB with least-recently-used eviction.
+"""
+import hashlib
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from config import (
+    CACHE_DIR, CACHE_MAX_MB, LOADER_ENGINE, REGION_CSV, REGION_SHEET_NAME, SHEET22_NAME, SHEET22_START_MONTH,
+)
+
+_DB_NAME = "models.sqlite"
+_SRC_DIR = Path(__file__).resolve().parent
+
+_LOCK = threading.Lock()
+_HASHES: Dict[Tuple[str, int, int], str] = {}
+_CODE_VERSION: Optional[str] = None
+
+
+def file_sha256(path: Path) -> str:
+    """Content hash of a file, memoized per (path, mtime, size)."""
+    path = Path(path)
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    with _LOCK:
+        cached = _HASHES.get(key)
+    if cached is not None:
+        return cached
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _LOCK:
+        _HASHES[key] = digest
+    return digest
+
+
+def code_version() -> str:
+    """Hash of the application sources; any code change invalidates cached models."""
+    global _CODE_VERSION
+    if _CODE_VERSION is None:
+        h = hashlib.sha256()
+        for src in sorted(_SRC_DIR.glob("*.py")):
+            h.update(src.name.encode())
+            h.update(src.read_bytes())
+        _CODE_VERSION = h.hexdigest()[:16]
+    return _CODE_VERSION
+
+
+def model_key(path: Path) -> str:
+    parts = [
+        file_sha256(path),
+        code_version(),
+        LOADER_ENGINE,
+        SHEET22_NAME,
+        SHEET22_START_MONTH or "",
+        REGION_SHEET_NAME,
+        file_sha256(REGION_CSV) if REGION_CSV is not None and REGION_CSV.exists() else "",
+    ]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    SQLite-backed key -> pickled value store with a total size bound.
+    Every operation opens its own connection, so one instance can be shared across threads.
+    """
+
+    def __init__(self, directory: Path = CACHE_DIR, max_bytes: int = int(CACHE_MAX_MB * 1e6)):
+        self.path = Path(directory) / _DB_NAME
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " key TEXT PRIMARY KEY, payload BLOB NOT NULL, size INTEGER NOT NULL,"
+                " created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # One transaction per operation; the connection is closed on exit, not left to GC
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT payload FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        try:
+            return pickle.loads(zlib.decompress(row[0]))
+        except Exception:
+            # Unreadable entry (e.g. written by an incompatible library version)
+            self.delete(key)
+            return None
+
+    def put(self, key: str, value: Any) -> int:
+        """Store value; returns the compressed size in bytes (0 if larger than the whole cache)."""
+        payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+        if len(payload) > self.max_bytes:
+            return 0
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, payload, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(payload), len(payload), now, now),
+            )
+            self._evict(conn)
+        return len(payload)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed ASC"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    def delete(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"entries": count, "bytes": total, "max_bytes": self.max_bytes, "path": str(self.path)}
+
+
+_DEFAULT: Optional[ResultCache] = None
+
+
+def default_cache() -> ResultCache:
+    global _DEFAULT
+    with _LOCK:
+        if _DEFAULT is None:
+            _DEFAULT = ResultCache()
+        return _DEFAULT
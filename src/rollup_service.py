@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from location_matrix import LocationMatrix, STREAMS
+
+UNASSIGNED_REGION = "Unassigned"
+NETWORK = "Network"
+
+
+@dataclass(frozen=True)
+class RollupCube:
+    """
+    Pre-aggregated location -> region -> network cube over months and revenue streams.
+    - regions: sorted region names (row axis of the region arrays)
+    - region_values: {stream: (R, M)}
+    - network_values: {stream: (M,)}
+    - region_sites: (R,) number of locations mapped to each region
+    - location_region: region of every matrix location (aligned with matrix.locations)
+    """
+    matrix: LocationMatrix
+    regions: pd.Index
+    region_values: Dict[str, np.ndarray]
+    network_values: Dict[str, np.ndarray]
+    region_sites: np.ndarray
+    location_region: pd.Series
+
+    @property
+    def has_regions(self) -> bool:
+        return len(self.regions) > 1 or (len(self.regions) == 1 and self.regions[0] != UNASSIGNED_REGION)
+
+    def region_frame(self, month: str) -> pd.DataFrame:
+        """
+        Region roll-up for one month.
+        Returns columns: Region, Sites, Total, Voice, SMS, Data, Share %
+        """
+        j = self.matrix.month_pos(month)
+        network_total = float(self.network_values["total"][j])
+        total = self.region_values["total"][:, j]
+        share = np.zeros_like(total)
+        if network_total:
+            share = total / network_total * 100.0
+        return pd.DataFrame(
+            {
+                "Region": self.regions,
+                "Sites": self.region_sites,
+                "Total": total,
+                "Voice": self.region_values["voice"][:, j],
+                "SMS": self.region_values["sms"][:, j],
+                "Data": self.region_values["data"][:, j],
+                "Share %": share,
+            }
+        )
+
+    def region_series(self, region: str, stream: str = "total") -> list[float]:
+        if region == NETWORK:
+            return [float(x) for x in self.network_values[stream]]
+        row = self.regions.get_loc(region)
+        return [float(x) for x in self.region_values[stream][row]]
+
+    def locations_in(self, region: str) -> list[str]:
+        return [str(loc) for loc, reg in self.location_region.items() if reg == region]
+
+
+def build_rollup_cube(matrix: LocationMatrix, region_map: Dict[str, str] | None = None) -> RollupCube:
+    """
+    Roll the location matrix up to regions and network in one grouped sum.
+    Locations missing from region_map fall under UNASSIGNED_REGION.
+    """
+    region_map = region_map or {}
+    location_region = pd.Series(
+        [region_map.get(str(loc), UNASSIGNED_REGION) for loc in matrix.locations],
+        index=matrix.locations,
+        name="Region",
+        dtype=object,
+    )
+    codes, regions = pd.factorize(location_region.to_numpy(), sort=True)
+    n_region = len(regions)
+
+    region_values = {}
+    network_values = {}
+    for s in STREAMS:
+        values = matrix.values[s]
+        out = np.zeros((n_region, values.shape[1]))
+        np.add.at(out, codes, values)
+        region_values[s] = out
+        network_values[s] = values.sum(axis=0)
+
+    return RollupCube(
+        matrix=matrix,
+        regions=pd.Index(regions, name="Region"),
+        region_values=region_values,
+        network_values=network_values,
+        region_sites=np.bincount(codes, minlength=n_region),
+        location_region=location_region,
+    )
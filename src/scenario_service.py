@@ -0,0 +1,140 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_DIR
+from location_matrix import STREAMS, LocationMatrix
+from model_store import get_model
+from utils import CalendarIndex, build_calendar_index
+
+STREAM_LABELS = {"total": "Total", "voice": "Voice", "sms": "SMS", "data": "Data"}
+
+
+@dataclass(frozen=True)
+class ScenarioComparison:
+    """
+    Several workbooks (versions or scenarios) on one shared location x month grid.
+    - labels: one label per workbook (axis 0)
+    - locations: union of locations (sorted)
+    - calendar: union of month sheets in calendar order
+    - values: {"total"|"voice"|"sms"|"data": float array (S, L, M)}, 0 where absent
+    - present: bool array (S, L, M)
+    """
+    labels: List[str]
+    locations: pd.Index
+    calendar: CalendarIndex
+    values: Dict[str, np.ndarray] = field(default_factory=dict)
+    present: np.ndarray = field(default_factory=lambda: np.zeros((0, 0, 0), dtype=bool))
+
+    @property
+    def months(self) -> List[str]:
+        return self.calendar.names
+
+    def _pos(self, label: str) -> int:
+        return self.labels.index(label)
+
+    def diff(self, other: str, base: str, stream: str = "total") -> np.ndarray:
+        """(L, M) array of other - base."""
+        values = self.values[stream]
+        return values[self._pos(other)] - values[self._pos(base)]
+
+    def changed(self, other: str, base: str, tolerance: float = 0.01) -> np.ndarray:
+        """(L, M) mask of cells that differ in any stream or in presence."""
+        i, j = self._pos(other), self._pos(base)
+        mask = self.present[i] != self.present[j]
+        for s in STREAMS:
+            mask |= np.abs(self.values[s][i] - self.values[s][j]) > tolerance
+        return mask
+
+    def month_summary(self, other: str, base: str) -> pd.DataFrame:
+        """Per month: base and other totals plus the difference for every stream."""
+        i, j = self._pos(other), self._pos(base)
+        out = {"Month": self.months}
+        for s in STREAMS:
+            base_totals = self.values[s][j].sum(axis=0)
+            other_totals = self.values[s][i].sum(axis=0)
+            out[f"{STREAM_LABELS[s]} Difference"] = other_totals - base_totals
+            if s == "total":
+                out[f"Total ({base})"] = base_totals
+                out[f"Total ({other})"] = other_totals
+        out["Changed Sites"] = self.changed(other, base).sum(axis=0)
+        return pd.DataFrame(out)
+
+    def location_diffs(self, other: str, base: str, tolerance: float = 0.01) -> pd.DataFrame:
+        """Long table of changed cells: Location, Month, one difference column per stream, Status."""
+        i, j = self._pos(other), self._pos(base)
+        rows, cols = np.nonzero(self.changed(other, base, tolerance))
+        months = np.asarray(self.months, dtype=object)
+        out = {
+            "Location": self.locations.to_numpy()[rows],
+            "Month": months[cols],
+        }
+        for s in STREAMS:
+            out[f"{STREAM_LABELS[s]} Difference"] = (self.values[s][i] - self.values[s][j])[rows, cols]
+        in_base = self.present[j][rows, cols]
+        in_other = self.present[i][rows, cols]
+        out["Status"] = np.where(in_base & in_other, "changed", np.where(in_other, f"only in {other}", f"only in {base}"))
+        df = pd.DataFrame(out)
+        return df.reindex(df["Total Difference"].abs().sort_values(ascending=False).index).reset_index(drop=True)
+
+
+def _align(matrix: LocationMatrix, locations: pd.Index, months: List[str], out: Dict[str, np.ndarray],
+           present: np.ndarray, s: int) -> None:
+    # Scatter one workbook's matrix into slot s of the shared grid
+    rows = locations.get_indexer(matrix.locations)
+    cols = np.array([months.index(m) for m in matrix.months], dtype=np.int64)
+    grid = np.ix_(rows, cols)
+    for stream in STREAMS:
+        out[stream][s][grid] = matrix.values[stream]
+    present[s][grid] = matrix.present
+
+
+def build_scenario_comparison(matrices: Dict[str, LocationMatrix]) -> ScenarioComparison:
+    """Align already-built location matrices (label -> matrix) on their union index."""
+    labels = list(matrices.keys())
+    locations = pd.Index([], name="Location")
+    month_names: List[str] = []
+    for matrix in matrices.values():
+        locations = locations.union(matrix.locations)
+        month_names += [m for m in matrix.months if m not in month_names]
+    locations = locations.rename("Location")
+    calendar = build_calendar_index(month_names)
+    months = calendar.names
+
+    shape = (len(labels), len(locations), len(months))
+    values = {s: np.zeros(shape, dtype=float) for s in STREAMS}
+    present = np.zeros(shape, dtype=bool)
+    for s, matrix in enumerate(matrices.values()):
+        _align(matrix, locations, months, values, present, s)
+
+    return ScenarioComparison(labels=labels, locations=locations, calendar=calendar, values=values, present=present)
+
+
+def compare_workbooks(paths: Sequence[Path], labels: Optional[Sequence[str]] = None,
+                      max_workers: int = 4) -> ScenarioComparison:
+    """
+    Load several workbooks concurrently and compare them.
+    Each workbook goes through get_model, so unchanged revisions are served from
+    the in-memory or disk cache instead of being reparsed.
+    Raises ValueError if a workbook has no monthly sheets.
+    """
+    paths = [Path(p) for p in paths]
+    labels = list(labels) if labels is not None else [p.stem for p in paths]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(paths)))) as pool:
+        models = list(pool.map(get_model, paths))
+
+    matrices = {}
+    for label, path, model in zip(labels, paths, models):
+        if model is None:
+            raise ValueError(f"No monthly sheets found in {path.name}")
+        matrices[label] = model["matrix"]
+    return build_scenario_comparison(matrices)
+
+
+def available_workbooks(directory: Path = DATA_DIR) -> List[Path]:
+    """Workbooks that can be compared (every .xlsx in the data folder)."""
+    return sorted(p for p in Path(directory).glob("*.xlsx") if not p.name.startswith("~$"))
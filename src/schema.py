@@ -0,0 +1,77 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+
+VOICE_COLS = [
+    "NBIP-NBIP Calls Revenue",
+    "Fixed Calls Revenue",
+    "Telekom Calls Revenue",
+    "BMobile Calls Revenue",
+    "International Calls Revenue",
+]
+
+SMS_COLS = [
+    "A2P SMS Revenue",
+    "Telekom SMS Revenue",
+    "BMobile SMS Revenue",
+    "International SMS Revenue",
+]
+
+DATA_COL = "Mobile Data Revenue"
+
+TOTAL_COL = "Total"
+
+REVENUE_COLS = VOICE_COLS + SMS_COLS + [DATA_COL, TOTAL_COL]
+
+REQUIRED_COLS = ["Location", TOTAL_COL]
+
+# Default column projection for loading: everything the KPIs use
+KPI_COLUMNS = ["Location"] + REVENUE_COLS
+
+# id(frame) -> frame for frames produced by validate_frame. Held outside df.attrs, which
+# pandas copies onto every derived frame (slices, assign, concat) whether still valid or not
+_VALIDATED: "weakref.WeakValueDictionary[int, pd.DataFrame]" = weakref.WeakValueDictionary()
+
+
+def validate_frame(df: pd.DataFrame, name: str = "frame") -> pd.DataFrame:
+    """
+    Validate and coerce a month frame in one pass:
+    - raises ValueError if a required column is missing
+    - adds missing revenue columns as 0
+    - coerces every revenue column to float (non-numeric -> 0) as one block
+    - Location as stripped str
+    The returned frame is marked validated (see is_validated).
+    """
+    for col in REQUIRED_COLS:
+        if col not in df.columns:
+            raise ValueError(f"Missing {col} in sheet {name}")
+
+    if is_validated(df):
+        return df
+
+    present = [col for col in REVENUE_COLS if col in df.columns]
+    sub = df[present]
+    if not all(pd.api.types.is_numeric_dtype(t) for t in sub.dtypes):
+        sub = sub.apply(pd.to_numeric, errors="coerce")
+    block = np.zeros((len(df), len(REVENUE_COLS)), dtype=float)
+    block[:, [REVENUE_COLS.index(col) for col in present]] = sub.to_numpy(dtype=float, na_value=np.nan)
+    block[np.isnan(block)] = 0.0
+
+    df = df.copy()
+    df[REVENUE_COLS] = block
+    df["Location"] = df["Location"].astype(str).str.strip()
+    return mark_validated(df)
+
+
+def mark_validated(df: pd.DataFrame) -> pd.DataFrame:
+    _VALIDATED[id(df)] = df
+    return df
+
+
+def is_validated(df: pd.DataFrame) -> bool:
+    """
+    True for frames produced by validate_frame (revenue columns present and float).
+    Only that exact object: frames derived from it are not marked.
+    """
+    return _VALIDATED.get(id(df)) is df
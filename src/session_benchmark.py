@@ -0,0 +1,182 @@
+"""
+Memory of the dashboard as simulated Streamlit sessions accumulate.
+
+Usage:
+  python session_benchmark.py --sessions 1,10,50
+  python session_benchmark.py --sessions 1,10,50 --locations 2000 --months 36
+  python session_benchmark.py --workers 4 --locations 2000
+
+Each simulated session is a streamlit AppTest of main.py that logs in (alternating
+board and management users) and renders its view; every session is kept alive so
+its session state stays resident. Process RSS is reported after each checkpoint.
+All sessions run in this process and share the process-wide model, as in a server.
+With --workers, separate processes load the model instead, with and without the
+memory-mapped Arrow model (SINBIP_SHARED_MODEL), and their added memory is compared.
+"""
+import argparse
+import gc
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent
+USERS = [("board", "SINBIP_BOARD_USER", "SINBIP_BOARD_PASS", "b0@rd!#$"),
+         ("manager", "SINBIP_MGMT_USER", "SINBIP_MGMT_PASS", "m@nag3r!#$")]
+
+
+def _credentials(i: int) -> tuple[str, str]:
+    default_user, user_var, pass_var, default_pass = USERS[i % len(USERS)]
+    return os.getenv(user_var, default_user), os.getenv(pass_var, default_pass)
+
+
+def open_session(i: int, timeout: float = 300):
+    """Start one logged-in dashboard session; raises RuntimeError if the app errors."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(SRC_DIR / "main.py"), default_timeout=timeout)
+    at.run()
+    username, password = _credentials(i)
+    at.text_input[0].input(username)
+    at.text_input[1].input(password)
+    at.button[0].click()
+    at.run()
+    if at.exception:
+        raise RuntimeError(f"Session {i} failed: {at.exception[0].value}")
+    return at
+
+
+def measure_sessions(checkpoints: list[int]) -> list[dict]:
+    """RSS after each checkpoint; delta_mb is relative to the process after imports, before any session."""
+    import streamlit  # noqa: F401  (import cost is not session cost)
+    from diagnostics import rss_bytes
+
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    gc.collect()
+    baseline = rss_bytes()
+    sessions = []
+    results = []
+    for target in sorted(checkpoints):
+        while len(sessions) < target:
+            sessions.append(open_session(len(sessions)))
+        gc.collect()
+        rss = rss_bytes()
+        results.append({
+            "sessions": target,
+            "rss_mb": rss / 1e6,
+            "delta_mb": (rss - baseline) / 1e6,
+        })
+    return results
+
+
+def _smaps_rollup() -> dict:
+    out = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    out[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    except OSError:
+        pass
+    return out
+
+
+def _worker(src_dir: str, env: dict, results, release) -> None:
+    os.environ.update(env)
+    sys.path.insert(0, src_dir)
+    from diagnostics import rss_bytes
+    from model_store import get_model
+
+    before = _smaps_rollup()
+    rss_before = rss_bytes()
+    model = get_model()
+    total = float(model["matrix"].values["total"].sum())  # touch the data
+    after = _smaps_rollup()
+    results.put({
+        "pid": os.getpid(),
+        "rss_mb": (rss_bytes() - rss_before) / 1e6,
+        "pss_mb": (after.get("Pss", 0) - before.get("Pss", 0)) / 1e6,
+        "private_mb": (after.get("Private_Clean", 0) + after.get("Private_Dirty", 0)
+                       - before.get("Private_Clean", 0) - before.get("Private_Dirty", 0)) / 1e6,
+        "total": total,
+    })
+    release.wait()
+
+
+def measure_workers(count: int, shared: bool) -> list[dict]:
+    """
+    Start `count` server-like processes that each load the model and stay alive together;
+    report the memory each one added for the model (RSS, proportional PSS and private pages).
+    """
+    import multiprocessing as mp
+
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    release = ctx.Event()
+    env = {"SINBIP_SHARED_MODEL": "1" if shared else "0", "SINBIP_DISK_CACHE": "1"}
+    if shared:
+        # Build and write the shared file once, as the first worker on a host would
+        proc = ctx.Process(target=_worker, args=(str(SRC_DIR), env, results, release))
+        proc.start()
+        results.get()
+        release.set()
+        proc.join()
+        release = ctx.Event()
+
+    procs = [ctx.Process(target=_worker, args=(str(SRC_DIR), env, results, release)) for _ in range(count)]
+    for p in procs:
+        p.start()
+    rows = [results.get() for _ in procs]
+    release.set()
+    for p in procs:
+        p.join()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure RSS as dashboard sessions accumulate.")
+    parser.add_argument("--sessions", default="1,10,50", help="Comma-separated checkpoints")
+    parser.add_argument("--workbook", type=Path, help="Workbook to serve (default: SINBIP_PRIMARY_EXCEL)")
+    parser.add_argument("--locations", type=int, help="Serve a synthetic workbook with this many locations")
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--workers", type=int, help="Instead of sessions: model memory of N processes, "
+                        "private copies vs the shared Arrow mapping")
+    args = parser.parse_args()
+
+    # The app reads its workbook from config at import time, so set it up before importing anything
+    workbook = args.workbook
+    if args.locations:
+        workbook = Path(tempfile.mkdtemp(prefix="sinbip_sessions_")) / "synthetic.xlsx"
+    if workbook is not None:
+        os.environ["SINBIP_PRIMARY_EXCEL"] = str(workbook)
+    os.environ.setdefault("SINBIP_DISK_CACHE", "0")
+    sys.path.insert(0, str(SRC_DIR))
+    os.chdir(SRC_DIR)
+    if args.locations:
+        from synthetic_workbook import generate_workbook
+
+        generate_workbook(workbook, locations=args.locations, months=args.months)
+
+    if args.workers:
+        for shared in (False, True):
+            rows = measure_workers(args.workers, shared)
+            label = "shared Arrow mapping" if shared else "private copies"
+            print(f"{args.workers} workers, {label}: "
+                  f"PSS {sum(r['pss_mb'] for r in rows):.1f} MB total, "
+                  f"private {sum(r['private_mb'] for r in rows):.1f} MB total, "
+                  f"RSS {sum(r['rss_mb'] for r in rows) / len(rows):.1f} MB per worker")
+        return
+
+    checkpoints = [int(x) for x in args.sessions.split(",") if x.strip()]
+    results = measure_sessions(checkpoints)
+    first = results[0]
+    for row in results:
+        per_session = (row["delta_mb"] - first["delta_mb"]) / (row["sessions"] - first["sessions"]) if row is not first else 0.0
+        print(f"{row['sessions']:>4} sessions  RSS {row['rss_mb']:8.1f} MB  (+{row['delta_mb']:.1f} MB, "
+              f"{per_session:.2f} MB per extra session)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Concurrent-session load test for the dashboard.
+
+Usage:
+  python session_loadtest.py --sessions 8 --iterations 5
+  python session_loadtest.py --sessions 20 --iterations 3 --locations 2000 --months 36
+
+Runs N simulated sessions at once (streamlit AppTest, one worker process each:
+AppTest keeps a process-global runtime, so sessions cannot share a process). Board sessions log in, switch the compared
+months and trend window, and export the board PDF; management sessions log in,
+switch months and change the plotted locations. Every rerun is timed.
+Reports p50/p95/max rerun latency per action, reruns per second and the peak
+combined RSS of the session processes.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+SRC_DIR = Path(__file__).resolve().parent
+
+
+def _by_label(widgets, label: str):
+    for w in widgets:
+        if w.label == label:
+            return w
+    raise LookupError(f"No widget labelled {label!r}")
+
+
+def _board_actions(at, rng: random.Random) -> List[tuple[str, Callable[[], None]]]:
+    months = _by_label(at.selectbox, "From").options
+    windows = _by_label(at.radio, "Window").options if any(r.label == "Window" for r in at.radio) else []
+    actions = [
+        ("compare_months", lambda: _by_label(at.selectbox, "From").select_index(rng.randrange(len(months)))),
+        ("export_pdf", lambda: _by_label(at.button, "Export Board PDF").click()),
+    ]
+    if windows:
+        actions.append(("trend_window", lambda: _by_label(at.radio, "Window").set_value(rng.choice(windows))))
+    return actions
+
+
+def _management_actions(at, rng: random.Random) -> List[tuple[str, Callable[[], None]]]:
+    months = _by_label(at.selectbox, "Select Month").options
+    actions = [("select_month", lambda: _by_label(at.selectbox, "Select Month").select_index(rng.randrange(len(months))))]
+    if at.multiselect:
+        locations = at.multiselect[0].options
+        actions.append((
+            "select_locations",
+            lambda: at.multiselect[0].set_value(rng.sample(locations, min(5, len(locations)))),
+        ))
+    return actions
+
+
+def run_session(i: int, iterations: int, src_dir: str, env: dict, ready, go, results) -> None:
+    """One simulated user in its own process; puts (timings by action, error or None) on `results`."""
+    os.environ.update(env)
+    sys.path.insert(0, src_dir)
+    os.chdir(src_dir)
+    from session_benchmark import _credentials
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(i)
+    timings: Dict[str, list] = {}
+
+    def timed(action: str) -> None:
+        t0 = time.perf_counter()
+        at.run()
+        timings.setdefault(action, []).append(time.perf_counter() - t0)
+        if at.exception:
+            raise RuntimeError(f"session {i} {action}: {at.exception[0].value}")
+
+    try:
+        # Untimed first run: module imports are process start-up, not session cost
+        AppTest.from_file(str(Path(src_dir) / "main.py"), default_timeout=600).run()
+        at = AppTest.from_file(str(Path(src_dir) / "main.py"), default_timeout=600)
+        ready.put(i)
+        go.wait()
+        timed("login_page")
+        username, password = _credentials(i)
+        at.text_input[0].input(username)
+        at.text_input[1].input(password)
+        at.button[0].click()
+        timed("login")
+        if not at.selectbox:
+            # The login form's st.rerun is not always replayed within the same AppTest run
+            timed("dashboard")
+
+        actions = _board_actions(at, rng) if i % 2 == 0 else _management_actions(at, rng)
+        for _ in range(iterations):
+            for name, act in actions:
+                act()
+                timed(name)
+        results.put((timings, None))
+    except Exception as e:
+        results.put((timings, f"{type(e).__name__}: {e}"))
+
+
+def _rss_of(pid: int) -> int:
+    from diagnostics import rss_bytes
+
+    return rss_bytes(pid) or 0
+
+
+def run_load_test(sessions: int, iterations: int) -> dict:
+    """
+    AppTest keeps one process-global Streamlit runtime, so simulated sessions cannot share
+    a process; each runs in its own worker process (like a multi-worker deployment, with
+    the model served from the disk cache or the shared Arrow file after the first build).
+    """
+    import multiprocessing as mp
+    from model_store import get_model
+    from scenario_service import available_workbooks
+
+    # Build (and persist) the models once up front, as warmup.py would before traffic arrives
+    get_model()
+    for path in available_workbooks():
+        get_model(path)
+
+    ctx = mp.get_context("spawn")
+    ready, results, go = ctx.Queue(), ctx.Queue(), ctx.Event()
+    env = {k: v for k, v in os.environ.items() if k.startswith(("SINBIP_", "STREAMLIT_"))}
+    procs = [
+        ctx.Process(target=run_session, args=(i, iterations, str(SRC_DIR), env, ready, go, results))
+        for i in range(sessions)
+    ]
+    for p in procs:
+        p.start()
+    for _ in procs:
+        ready.get()
+
+    peak = {"rss": 0}
+    done = threading.Event()
+
+    def sample_memory() -> None:
+        while not done.is_set():
+            peak["rss"] = max(peak["rss"], sum(_rss_of(p.pid) for p in procs))
+            done.wait(0.05)
+
+    sampler = threading.Thread(target=sample_memory, daemon=True)
+    sampler.start()
+    t0 = time.perf_counter()
+    go.set()
+    timings: Dict[str, list] = {}
+    errors: List[str] = []
+    for _ in procs:
+        session_timings, error = results.get()
+        for action, values in session_timings.items():
+            timings.setdefault(action, []).extend(values)
+        if error:
+            errors.append(error)
+    elapsed = time.perf_counter() - t0
+    done.set()
+    sampler.join()
+    for p in procs:
+        p.join()
+
+    all_ms = np.array([v for values in timings.values() for v in values]) * 1000
+    per_action = {
+        action: {
+            "count": len(values),
+            "p50_ms": float(np.percentile(np.array(values) * 1000, 50)),
+            "p95_ms": float(np.percentile(np.array(values) * 1000, 95)),
+        }
+        for action, values in sorted(timings.items())
+    }
+    return {
+        "sessions": sessions,
+        "reruns": int(len(all_ms)),
+        "seconds": elapsed,
+        "reruns_per_sec": len(all_ms) / elapsed if elapsed else 0.0,
+        "p50_ms": float(np.percentile(all_ms, 50)) if len(all_ms) else 0.0,
+        "p95_ms": float(np.percentile(all_ms, 95)) if len(all_ms) else 0.0,
+        "max_ms": float(all_ms.max()) if len(all_ms) else 0.0,
+        "peak_rss_mb": peak["rss"] / 1e6,
+        "actions": per_action,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for the SINBIP dashboard.")
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=5, help="Passes over each session's actions")
+    parser.add_argument("--workbook", type=Path)
+    parser.add_argument("--locations", type=int, help="Serve a synthetic workbook with this many locations")
+    parser.add_argument("--months", type=int, default=24)
+    args = parser.parse_args()
+
+    # The app reads its workbook from config at import time
+    workbook = args.workbook
+    if args.locations:
+        workbook = Path(tempfile.mkdtemp(prefix="sinbip_loadtest_")) / "synthetic.xlsx"
+    if workbook is not None:
+        os.environ["SINBIP_PRIMARY_EXCEL"] = str(workbook)
+    os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+    sys.path.insert(0, str(SRC_DIR))
+    os.chdir(SRC_DIR)
+    if args.locations:
+        from synthetic_workbook import generate_workbook
+
+        generate_workbook(workbook, locations=args.locations, months=args.months)
+
+    r = run_load_test(args.sessions, args.iterations)
+    print(f"{r['sessions']} concurrent sessions: {r['reruns']} reruns in {r['seconds']:.1f}s "
+          f"({r['reruns_per_sec']:.1f} reruns/s)")
+    print(f"  rerun latency p50 {r['p50_ms']:.0f} ms  p95 {r['p95_ms']:.0f} ms  max {r['max_ms']:.0f} ms")
+    print(f"  peak RSS {r['peak_rss_mb']:.0f} MB (all session processes)")
+    for action, stats in r["actions"].items():
+        print(f"  {action:<18} n={stats['count']:<4} p50 {stats['p50_ms']:7.0f} ms  p95 {stats['p95_ms']:7.0f} ms")
+    if r["errors"]:
+        print(f"  {len(r['errors'])} session(s) failed: {r['errors'][0]}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
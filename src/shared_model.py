@@ -0,0 +1,79 @@
+"""
+Cross-process shared model in a memory-mapped Arrow IPC file.
+
+The model is pickled with protocol 5: every contiguous numpy buffer (month frame
+columns, location matrices, prefix sums, Sheet22 values, ...) goes out-of-band
+into its own record batch of the IPC file, and the remaining object graph is
+stored in the schema metadata. Workers map the file read-only and unpickle
+against the mapped buffers, so numeric data is never copied: N server processes
+on one host share a single page-cache copy, and a new worker is ready without
+parsing the workbook.
+"""
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import pyarrow as pa
+
+from config import CACHE_DIR
+
+SHARED_DIR = CACHE_DIR / "arrow"
+_META_KEY = b"sinbip_model"
+_SCHEMA = pa.schema([pa.field("buffer", pa.uint8())])
+_KEEP_FILES = 4
+
+
+def shared_model_path(key: str, directory: Path = SHARED_DIR) -> Path:
+    return Path(directory) / f"model_{key[:24]}.arrow"
+
+
+def write_shared_model(model: Dict[str, Any], path: Path) -> Path:
+    """Write the model to an Arrow IPC file (atomically, via a temporary file)."""
+    buffers: list = []
+    meta = pickle.dumps(model, protocol=5, buffer_callback=buffers.append)
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    schema = _SCHEMA.with_metadata({_META_KEY: meta})
+    with pa.OSFile(str(tmp), "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+        for buf in buffers:
+            raw = buf.raw()
+            data = pa.Array.from_buffers(pa.uint8(), raw.nbytes, [None, pa.py_buffer(raw)])
+            writer.write_batch(pa.record_batch([data], schema=schema))
+    tmp.replace(path)
+    _prune(path.parent, keep=path)
+    return path
+
+
+def read_shared_model(path: Path) -> Dict[str, Any]:
+    """
+    Map a model file read-only. Numeric arrays in the result are zero-copy,
+    read-only views of the mapping (object columns such as names are unpickled normally).
+    """
+    source = pa.memory_map(str(path), "r")
+    reader = pa.ipc.open_file(source)
+    meta = reader.schema.metadata[_META_KEY]
+    buffers = [reader.get_batch(i).column(0).buffers()[1] for i in range(reader.num_record_batches)]
+    return pickle.loads(meta, buffers=buffers)
+
+
+def load_shared_model(key: str, directory: Path = SHARED_DIR) -> Optional[Dict[str, Any]]:
+    path = shared_model_path(key, directory)
+    if not path.exists():
+        return None
+    try:
+        return read_shared_model(path)
+    except (OSError, pa.ArrowInvalid, pickle.UnpicklingError, KeyError):
+        return None
+
+
+def _prune(directory: Path, keep: Path) -> None:
+    # Older workbook versions; processes still mapping them keep their pages (unlinked files stay mapped)
+    files = sorted(directory.glob("model_*.arrow"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in [p for p in files if p != keep][_KEEP_FILES - 1:]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
@@ -1,6 +1,13 @@
+import logging
+import numpy as np
 import pandas as pd
-from typing import Optional, Dict, Any
-from utils import safe_float
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+from config import SHEET22_START_MONTH
+from utils import safe_float, parse_month_name, parse_month_sheet_name
+
+logger = logging.getLogger(__name__)
 
 def detect_target_total(sheet22: pd.DataFrame) -> Optional[float]:
     """
@@ -106,3 +113,126 @@ def build_sheet22_context(sheet22: pd.DataFrame) -> Dict[str, Any]:
                         if pd.notna(num):
                             context[label] = safe_float(num)
     return context
+
+
+def _month_columns(sheet22: pd.DataFrame) -> List[str]:
+    return [c for c in sheet22.columns if str(c).strip().lower() != "location"]
+
+
+def _next_month(dt: datetime, month: int) -> datetime:
+    # First date strictly after dt that falls in the given calendar month
+    year = dt.year + (1 if month <= dt.month else 0)
+    return datetime(year, month, 1)
+
+
+def _axis_from(start: datetime, month_nums: List[tuple]) -> Dict[str, datetime]:
+    # First column at the first occurrence of its month from start, then the next occurrence of each
+    first_month = month_nums[0][1]
+    axis = {}
+    current = datetime(start.year, first_month, 1) if start.month == first_month else _next_month(start, first_month)
+    for i, (col, month) in enumerate(month_nums):
+        if i:
+            current = _next_month(current, month)
+        axis[col] = current
+    return axis
+
+
+def resolve_month_axis(
+    columns: List[str],
+    start: Optional[datetime] = None,
+    month_periods: Optional[List[Optional[datetime]]] = None,
+) -> Dict[str, datetime]:
+    """
+    Resolve Sheet22 month columns (MAR, APR, ... MAR.1, JUNE, ...) to calendar months.
+    Anchored on `start` (else SHEET22_START_MONTH, else the month sheet in `month_periods`
+    with the same month as the first column whose axis covers the most month sheets;
+    a tie is logged and resolved to the earliest). Each following column is the next
+    occurrence of its month. Non-month columns are skipped.
+    Returns {column: datetime(YYYY, MM, 1)}; empty if no anchor can be found.
+    """
+    month_nums = [(c, parse_month_name(c)) for c in columns]
+    month_nums = [(c, m) for c, m in month_nums if m is not None]
+    if not month_nums:
+        return {}
+
+    first_month = month_nums[0][1]
+    if start is None and SHEET22_START_MONTH:
+        start = parse_month_sheet_name(SHEET22_START_MONTH)
+        if start is None:
+            try:
+                start = datetime.strptime(SHEET22_START_MONTH, "%Y-%m")
+            except ValueError:
+                start = None
+    if start is not None:
+        return _axis_from(start, month_nums)
+    if not month_periods:
+        return {}
+
+    sheets = {p for p in month_periods if p is not None}
+    candidates = sorted(p for p in sheets if p.month == first_month)
+    if not candidates:
+        return {}
+    axes = [_axis_from(p, month_nums) for p in candidates]
+    overlap = [len(sheets.intersection(axis.values())) for axis in axes]
+    best = max(overlap)
+    tied = [p for p, n in zip(candidates, overlap) if n == best]
+    if len(tied) > 1:
+        logger.warning(
+            "Sheet22 month axis is ambiguous: anchors %s each match %d month sheet(s); using %s "
+            "(set SINBIP_SHEET22_START_MONTH to choose)",
+            ", ".join(f"{p:%Y-%m}" for p in tied), best, f"{tied[0]:%Y-%m}",
+        )
+    return axes[overlap.index(best)]
+
+
+@dataclass(frozen=True)
+class Sheet22Series:
+    """
+    Sheet22 as a dense time series on a calendar axis.
+    - locations: sorted location names (total rows excluded)
+    - periods: resolved calendar month per column (chronological)
+    - columns: original Sheet22 column for each period
+    - values: (L, T) float array, NaN where Sheet22 is blank
+    - control_totals: (T,) Sheet22 "Total" row (NaN if absent)
+    """
+    locations: pd.Index
+    periods: pd.DatetimeIndex
+    columns: List[str]
+    values: np.ndarray
+    control_totals: np.ndarray
+
+    def align(self, locations: pd.Index, periods: List[Optional[datetime]]) -> np.ndarray:
+        """Values reindexed onto another (locations x periods) grid, NaN where absent."""
+        frame = pd.DataFrame(self.values, index=self.locations, columns=self.periods)
+        keys = [pd.Timestamp(p) if p is not None else pd.NaT for p in periods]
+        return frame.reindex(index=locations, columns=keys).to_numpy(dtype=float)
+
+
+def build_sheet22_series(
+    sheet22: pd.DataFrame,
+    start: Optional[datetime] = None,
+    month_periods: Optional[List[Optional[datetime]]] = None,
+) -> Optional[Sheet22Series]:
+    """Resolve the month axis once and store Sheet22 as dense arrays; None if unusable."""
+    if sheet22 is None or sheet22.empty or "Location" not in sheet22.columns:
+        return None
+    axis = resolve_month_axis(_month_columns(sheet22), start, month_periods)
+    if not axis:
+        return None
+
+    cols = sorted(axis, key=axis.get)
+    locations = sheet22["Location"].astype(str).str.strip()
+    total_mask = locations.str.lower().str.contains(r"\btotal\b", na=False).to_numpy()
+    values = sheet22[cols].apply(pd.to_numeric, errors="coerce")
+
+    control = values[total_mask]
+    control_totals = control.iloc[0].to_numpy(dtype=float) if len(control) else np.full(len(cols), np.nan)
+    by_location = values[~total_mask].groupby(locations[~total_mask].to_numpy()).sum(min_count=1)
+
+    return Sheet22Series(
+        locations=pd.Index(by_location.index, name="Location"),
+        periods=pd.DatetimeIndex([axis[c] for c in cols]),
+        columns=cols,
+        values=by_location.to_numpy(dtype=float),
+        control_totals=control_totals,
+    )
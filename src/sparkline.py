@@ -1,6 +1,9 @@
 import pandas as pd
-import altair as alt
-from typing import Dict, List
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    import altair as alt
 
 
 def _build_month_labels(month_cols: List[str]) -> Dict[str, str]:
@@ -19,9 +22,11 @@ def _build_month_labels(month_cols: List[str]) -> Dict[str, str]:
     return labels
 
 
-def build_location_trend_frame(sheet22: pd.DataFrame) -> pd.DataFrame:
+def build_location_trend_frame(sheet22: pd.DataFrame, month_axis: Dict[str, datetime] | None = None) -> pd.DataFrame:
     """
     Transform Sheet22 (wide, month columns) into a long DataFrame for sparklines.
+    month_axis (see sheet22_service.resolve_month_axis) labels columns with their
+    calendar month (e.g. "Mar 2025") instead of the raw column name.
     Returns columns: Month, Location, Total
     """
     if sheet22 is None or sheet22.empty or "Location" not in sheet22.columns:
@@ -34,6 +39,9 @@ def build_location_trend_frame(sheet22: pd.DataFrame) -> pd.DataFrame:
         return pd.DataFrame(columns=["Month", "Location", "Total"])
 
     label_map = _build_month_labels(month_cols)
+    if month_axis:
+        month_cols = sorted(month_cols, key=lambda c: (c not in month_axis, month_axis.get(c, datetime.max)))
+        label_map.update({c: f"{month_axis[c]:%b %Y}" for c in month_cols if c in month_axis})
     ordered_labels = [label_map[c] for c in month_cols]
 
     records = []
@@ -50,11 +58,13 @@ def build_location_trend_frame(sheet22: pd.DataFrame) -> pd.DataFrame:
     return trend_df
 
 
-def sparkline_chart(trend_df: pd.DataFrame, location: str, width: int = 160, height: int = 60) -> alt.Chart:
+def sparkline_chart(trend_df: pd.DataFrame, location: str, width: int = 160, height: int = 60) -> "alt.Chart":
     """
     Build a single-location sparkline (line + points) for embedding in tables/cards.
     Expects trend_df from build_location_trend_frame.
     """
+    import altair as alt
+
     filtered = trend_df[trend_df["Location"] == location]
     if filtered.empty:
         filtered = pd.DataFrame({"Month": [], "Total": []})
@@ -77,11 +87,13 @@ def sparkline_chart(trend_df: pd.DataFrame, location: str, width: int = 160, hei
     return base
 
 
-def demo_sparklines(trend_df: pd.DataFrame) -> alt.Chart:
+def demo_sparklines(trend_df: pd.DataFrame) -> "alt.Chart":
     """
     Convenience helper to preview sparklines for the top 10 revenue locations.
     Returns an Altair facet chart (not used in app yet).
     """
+    import altair as alt
+
     if trend_df is None or trend_df.empty:
         return alt.Chart(pd.DataFrame({"Month": [], "Total": []})).mark_line()
 
@@ -113,11 +125,13 @@ def multi_location_chart(
     locations: list[str] | None = None,
     width: int = 1400,
     height: int = 350,
-) -> alt.Chart:
+) -> "alt.Chart":
     """
     Plot month on x-axis, revenue on y-axis, with separate lines per location.
     If locations is None, show all.
     """
+    import altair as alt
+
     if trend_df is None or trend_df.empty:
         return alt.Chart(pd.DataFrame({"Month": [], "Total": []})).mark_line()
 
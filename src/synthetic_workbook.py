@@ -0,0 +1,108 @@
+"""
+Generate SINBIP-shaped workbooks at arbitrary scale for benchmarking.
+
+Usage:
+  python synthetic_workbook.py out.xlsx --locations 2000 --months 36
+"""
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from openpyxl import Workbook
+
+from config import SHEET22_NAME
+from schema import VOICE_COLS, SMS_COLS, DATA_COL, TOTAL_COL
+
+_MONTH_ABBR = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+
+
+def _month_sequence(start: datetime, count: int) -> list[datetime]:
+    out = []
+    year, month = start.year, start.month
+    for _ in range(count):
+        out.append(datetime(year, month, 1))
+        month += 1
+        if month > 12:
+            month = 1
+            year += 1
+    return out
+
+
+def generate_workbook(
+    path: Path,
+    locations: int = 60,
+    months: int = 24,
+    start: datetime = datetime(2024, 3, 1),
+    title_rows: int = 2,
+    zero_fraction: float = 0.1,
+    seed: int = 0,
+) -> Path:
+    """
+    Write a workbook with `months` month sheets (mar_24, apr_24, ...) and a Sheet22.
+    Each month sheet has `title_rows` title/blank rows above the header, one row
+    per location and a trailing Total row. Sheet22 repeats month names across
+    years (MAR, APR, ... MAR, APR) like the real control sheet.
+    """
+    rng = np.random.default_rng(seed)
+    path = Path(path)
+    periods = _month_sequence(start, months)
+    names = [f"NBIP_Site_{i:05d}" for i in range(locations)]
+    header = ["Location"] + VOICE_COLS + SMS_COLS + [DATA_COL, TOTAL_COL]
+
+    base = rng.gamma(2.0, 4000.0, size=locations)
+    growth = rng.normal(1.01, 0.05, size=(locations, months)).cumprod(axis=1)
+    totals_by_month = np.zeros((locations, months))
+
+    wb = Workbook(write_only=True)
+    for j, period in enumerate(periods):
+        ws = wb.create_sheet(f"{_MONTH_ABBR[period.month - 1]}_{period.year % 100:02d}")
+        for r in range(title_rows):
+            ws.append([f"SINBIP Monthly Revenue - {period:%B %Y}"] if r == 0 else [])
+        ws.append(header)
+
+        scale = base * growth[:, j]
+        zero = rng.random(locations) < zero_fraction
+        voice = rng.dirichlet(np.ones(len(VOICE_COLS)), size=locations) * (scale * 0.35)[:, None]
+        sms = rng.dirichlet(np.ones(len(SMS_COLS)), size=locations) * (scale * 0.02)[:, None]
+        data = scale * 0.63
+        voice[zero] = 0
+        sms[zero] = 0
+        data[zero] = 0
+        voice = voice.round(2)
+        sms = sms.round(2)
+        data = data.round(2)
+        total = voice.sum(axis=1) + sms.sum(axis=1) + data
+        totals_by_month[:, j] = total
+
+        for i in range(locations):
+            ws.append([names[i], *voice[i].tolist(), *sms[i].tolist(), float(data[i]), round(float(total[i]), 2)])
+        ws.append(
+            ["Total", *voice.sum(axis=0).round(2).tolist(), *sms.sum(axis=0).round(2).tolist(),
+             round(float(data.sum()), 2), round(float(total.sum()), 2)]
+        )
+
+    ws = wb.create_sheet(SHEET22_NAME)
+    ws.append(["Location"] + [p.strftime("%b").upper() for p in periods])
+    for i in range(locations):
+        ws.append([names[i], *totals_by_month[i].round(2).tolist()])
+    ws.append(["Total", *totals_by_month.sum(axis=0).round(2).tolist()])
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wb.save(path)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a synthetic SINBIP workbook.")
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--locations", type=int, default=60)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_workbook(args.output, locations=args.locations, months=args.months, seed=args.seed)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
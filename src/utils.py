@@ -1,6 +1,8 @@
 import re
+from bisect import bisect_left, bisect_right
 from datetime import datetime
-from typing import Any, Dict, Iterable
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
 
 def safe_float(x: Any, default: float = 0.0) -> float:
     try:
@@ -42,15 +44,30 @@ _MONTH_MAP = {
 }
 
 
+def parse_month_name(text: str) -> int | None:
+    """
+    Month number from a bare month label as used in Sheet22
+    (MAR, JULY, SEPTEMBER, MAR.1, MAR_2, ...). Returns None if not a month.
+    """
+    m = re.match(r"^\s*([a-z]+)", str(text).lower())
+    if not m:
+        return None
+    return _MONTH_MAP.get(m.group(1))
+
+
+# Format: mon_yy or mon_yyyy (e.g., mar_24, jul_25, nov_2025)
+_MONTH_SHEET_RE = re.compile(r"^([a-z]{3,9})[ _\-]+(\d{2}|\d{4})$")
+
+
+@lru_cache(maxsize=4096)
 def parse_month_sheet_name(sheet_name: str) -> datetime | None:
     """
     Supports: mar_24, jul_25, nov_2025, etc.
-    Returns datetime(YYYY, MM, 1) for ordering.
+    Returns datetime(YYYY, MM, 1) for ordering. Memoized per name.
     """
     s = str(sheet_name).strip().lower()
 
-    # Format: mon_yy or mon_yyyy (e.g., mar_24, jul_25, nov_2025)
-    m = re.match(r"^([a-z]{3,9})[ _\-]+(\d{2}|\d{4})$", s)
+    m = _MONTH_SHEET_RE.match(s)
     if not m:
         return None
 
@@ -78,3 +95,91 @@ def sort_month_sheets(sheet_names: list[str]) -> list[str]:
             parsed.append((dt, name))
     parsed.sort(key=lambda x: x[0])
     return [name for _, name in parsed]
+
+
+def month_ordinal(dt: datetime) -> int:
+    return dt.year * 12 + dt.month - 1
+
+
+class CalendarIndex:
+    """
+    Built once per workbook: maps month sheet names <-> period ordinals
+    (year * 12 + month - 1) <-> display labels ("Mar 2024").
+    Names are held in chronological order; sheets whose names are not months
+    keep their given order after the dated ones and have no ordinal.
+    Lookups, adjacency and range queries are O(1) / O(log n).
+    """
+
+    def __init__(self, sheet_names: Iterable[str]):
+        dated = []
+        undated = []
+        for name in sheet_names:
+            dt = parse_month_sheet_name(name)
+            (dated if dt else undated).append((dt, name))
+        dated.sort(key=lambda x: x[0])
+
+        self.names: List[str] = [n for _, n in dated] + [n for _, n in undated]
+        self.periods: List[Optional[datetime]] = [dt for dt, _ in dated] + [None] * len(undated)
+        self.ordinals: List[Optional[int]] = [month_ordinal(dt) if dt else None for dt in self.periods]
+        self.labels: List[str] = [f"{dt:%b %Y}" if dt else n for dt, n in zip(self.periods, self.names)]
+        self._pos: Dict[str, int] = {n: i for i, n in enumerate(self.names)}
+        self._by_ordinal: Dict[int, int] = {o: i for i, o in enumerate(self.ordinals) if o is not None}
+        self._sorted_ordinals: List[int] = [o for o in self.ordinals if o is not None]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._pos
+
+    @property
+    def latest(self) -> Optional[str]:
+        return self.names[-1] if self.names else None
+
+    def position(self, name: str) -> int:
+        return self._pos[name]
+
+    def ordinal(self, name: str) -> Optional[int]:
+        return self.ordinals[self._pos[name]]
+
+    def period(self, name: str) -> Optional[datetime]:
+        return self.periods[self._pos[name]]
+
+    def label(self, name: str) -> str:
+        pos = self._pos.get(name)
+        return self.labels[pos] if pos is not None else str(name)
+
+    def name_for_ordinal(self, ordinal: int) -> Optional[str]:
+        pos = self._by_ordinal.get(ordinal)
+        return self.names[pos] if pos is not None else None
+
+    def previous(self, name: str) -> Optional[str]:
+        """Previous sheet in chronological order (the MoM comparison month)."""
+        pos = self._pos[name]
+        return self.names[pos - 1] if pos > 0 else None
+
+    def same_month_last_year(self, name: str) -> Optional[str]:
+        ordinal = self.ordinal(name)
+        return self.name_for_ordinal(ordinal - 12) if ordinal is not None else None
+
+    def between(self, start: str, end: str) -> List[str]:
+        """Month sheets from start to end (inclusive), by calendar order."""
+        lo, hi = self.ordinal(start), self.ordinal(end)
+        if lo is None or hi is None:
+            return self.names[self._pos[start]: self._pos[end] + 1]
+        i = bisect_left(self._sorted_ordinals, lo)
+        j = bisect_right(self._sorted_ordinals, hi)
+        return self.names[i:j]
+
+
+def build_calendar_index(sheet_names: Iterable[str]) -> CalendarIndex:
+    """
+    Calendar for a workbook's month sheets: only sheets with month names when
+    there are any (as sort_month_sheets), otherwise every sheet in name order.
+    """
+    names = list(sheet_names)
+    dated = [n for n in names if parse_month_sheet_name(n)]
+    return CalendarIndex(dated or sorted(names))
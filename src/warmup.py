@@ -0,0 +1,107 @@
+"""
+Warm every cache ahead of the first dashboard visit.
+
+Usage:
+  python warmup.py
+  python warmup.py --workbook ../data/SINBIP_MONTHLY_REPORT_UPDATED.xlsx --no-pdf
+
+Builds the model (populating the persistent disk cache so a freshly started
+server loads it without parsing) and renders the board PDF into the cache
+directory. Per-month KPI summaries and trend/window series are part of the model.
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict
+
+from config import APP_TITLE, BOARD_PDF_APPENDIX, CACHE_DIR, EXPORT_DIR, PRIMARY_EXCEL
+from model_store import get_model
+from result_cache import model_key
+
+
+def board_pdf_filename(model: dict) -> str:
+    return f"SINBIP_Board_Report_{model['latest_name']}.pdf"
+
+
+def cached_board_pdf(model: dict, workbook: Path = PRIMARY_EXCEL, appendix: bool = BOARD_PDF_APPENDIX,
+                     title: str = APP_TITLE) -> Path:
+    """
+    Board PDF for the model, rendered once per workbook content, code version and
+    render settings (title, appendix mode), kept under CACHE_DIR/pdf and copied into EXPORT_DIR.
+    """
+    # Everything that appears in the PDF besides the model goes into the key
+    settings = json.dumps({"title": title, "appendix": bool(appendix)}, sort_keys=True)
+    key = hashlib.sha256(f"{model_key(workbook)}|{settings}".encode()).hexdigest()
+    cached = CACHE_DIR / "pdf" / f"board_{key[:24]}.pdf"
+    if not cached.exists():
+        from pdf_export import appendix_rows, export_board_pdf
+
+        rows = None
+        if appendix:
+            latest = model["latest_name"]
+            rows = appendix_rows(model["matrix"], latest, model["calendar"].previous(latest))
+
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        # Unique per writer: concurrent sessions may render the same report at once
+        tmp = cached.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        export_board_pdf(
+            output_path=tmp,
+            title=title,
+            kpis=model["latest_kpis"],
+            mom=model["mom"],
+            sheet22_ctx=model["sheet22_ctx"],
+            trend=model.get("trend"),
+            latest_name=model["latest_name"],
+            reconciliation=model.get("reconciliation"),
+            appendix=rows,
+        )
+        tmp.replace(cached)
+
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    out_path = EXPORT_DIR / board_pdf_filename(model)
+    # Replaced atomically: other sessions may be reading the current copy
+    tmp = out_path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    shutil.copyfile(cached, tmp)
+    os.replace(tmp, out_path)
+    return out_path
+
+
+def warm_caches(workbook: Path = PRIMARY_EXCEL, pdf: bool = True,
+                appendix: bool = BOARD_PDF_APPENDIX) -> Dict[str, float]:
+    """Run every warm-up step; returns seconds per step. Raises ValueError if the workbook has no month sheets."""
+    timings = {}
+
+    t0 = time.perf_counter()
+    model = get_model(workbook)
+    timings["model"] = time.perf_counter() - t0
+    if model is None:
+        raise ValueError(f"No monthly sheets found in {Path(workbook).name}")
+
+    if pdf:
+        t0 = time.perf_counter()
+        cached_board_pdf(model, workbook, appendix)
+        timings["board_pdf"] = time.perf_counter() - t0
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Warm the SINBIP model, KPI and PDF caches.")
+    parser.add_argument("--workbook", type=Path, default=PRIMARY_EXCEL)
+    parser.add_argument("--no-pdf", action="store_true", help="Skip rendering the board PDF")
+    parser.add_argument("--appendix", action="store_true", default=BOARD_PDF_APPENDIX,
+                        help="Include the all-locations appendix in the board PDF")
+    args = parser.parse_args()
+
+    timings = warm_caches(args.workbook, pdf=not args.no_pdf, appendix=args.appendix)
+    for step, seconds in timings.items():
+        print(f"{step:<12} {seconds:8.3f}s")
+    print(f"Caches warm for {args.workbook.name}")
+
+
+if __name__ == "__main__":
+    main()
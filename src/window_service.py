@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from location_matrix import LocationMatrix, STREAMS
+from utils import month_ordinal
+
+WINDOWS = {"Monthly": 1, "Trailing 3": 3, "Trailing 12": 12, "YTD": "ytd"}
+
+
+@dataclass(frozen=True)
+class WindowAggregates:
+    """
+    Prefix sums over the month axis, so any window total is two lookups.
+    Windows are calendar months: "Trailing 3" ending at a month covers the sheets
+    within the last 3 calendar months, fewer sheets when one is missing.
+    - prefix: {stream: (L, M + 1)} per-location cumulative sums
+    - network_prefix: {stream: (M + 1,)} network-level cumulative sums
+    - year_start: (M,) position of the first month of the same calendar year
+    - ordinals: (M,) calendar month ordinal per column (-1 if the sheet is not a month)
+    - starts: {window: (M,)} first position of the window ending at each month (WINDOWS)
+    """
+    matrix: LocationMatrix
+    prefix: Dict[str, np.ndarray]
+    network_prefix: Dict[str, np.ndarray]
+    year_start: np.ndarray
+    ordinals: np.ndarray
+    starts: Dict[Any, np.ndarray]
+
+    def window_starts(self, window) -> np.ndarray:
+        """(M,) first position of the window ending at each month."""
+        starts = self.starts.get(window)
+        return starts if starts is not None else _window_starts(self.ordinals, self.year_start, window)
+
+    def _bounds(self, month: str, window) -> tuple:
+        end = self.matrix.month_pos(month) + 1
+        return int(self.window_starts(window)[end - 1]), end
+
+    def total(self, month: str, window=1, stream: str = "total", location: Optional[str] = None) -> float:
+        """Window total ending at `month` (inclusive) for the network or one location."""
+        start, end = self._bounds(month, window)
+        if location is None:
+            p = self.network_prefix[stream]
+            return float(p[end] - p[start])
+        row = self.matrix.locations.get_loc(location)
+        p = self.prefix[stream][row]
+        return float(p[end] - p[start])
+
+    def ytd(self, month: str, stream: str = "total", location: Optional[str] = None) -> float:
+        return self.total(month, "ytd", stream, location)
+
+    def trailing(self, month: str, n: int, stream: str = "total", location: Optional[str] = None) -> float:
+        return self.total(month, n, stream, location)
+
+    def mix(self, month: str, window=1, location: Optional[str] = None) -> Dict[str, float]:
+        """Voice/SMS/data shares (percent of window total)."""
+        total = self.total(month, window, "total", location)
+        return {
+            s: (self.total(month, window, s, location) / total * 100.0) if total else 0.0
+            for s in ("voice", "sms", "data")
+        }
+
+    def location_totals(self, month: str, window=1, stream: str = "total", reporting_only: bool = False) -> pd.Series:
+        """
+        Window totals for every location at once. reporting_only drops locations absent
+        from every month of the window (otherwise they appear as 0).
+        """
+        start, end = self._bounds(month, window)
+        p = self.prefix[stream]
+        totals = pd.Series(p[:, end] - p[:, start], index=self.matrix.locations, name=stream)
+        if reporting_only:
+            totals = totals[self.matrix.present[:, start:end].any(axis=1)]
+        return totals
+
+    def series(self, window=1, stream: str = "total") -> list[float]:
+        """Network window totals for every month (chronological)."""
+        p = self.network_prefix[stream]
+        end = np.arange(1, len(self.matrix.months) + 1)
+        return [float(x) for x in p[end] - p[self.window_starts(window)]]
+
+
+def _year_start(matrix: LocationMatrix) -> np.ndarray:
+    # Months without a parsed date never reset the year
+    starts = np.zeros(len(matrix.months), dtype=np.int64)
+    current_year = None
+    start = 0
+    for j, period in enumerate(matrix.periods):
+        if period is not None and period.year != current_year:
+            current_year = period.year
+            start = j
+        starts[j] = start
+    return starts
+
+
+def _window_starts(ordinals: np.ndarray, year_start: np.ndarray, window) -> np.ndarray:
+    # Trailing N: the first month with ordinal > current - N (months are chronological);
+    # sheets that are not months fall back to counting sheets
+    if window == "ytd":
+        return year_start
+    n = int(window)
+    starts = np.maximum(np.arange(1, len(ordinals) + 1) - n, 0)
+    dated = np.flatnonzero(ordinals >= 0)
+    if dated.size:
+        d = ordinals[dated]
+        starts[dated] = dated[np.searchsorted(d, d - n + 1, side="left")]
+    return starts
+
+
+def build_window_aggregates(matrix: LocationMatrix) -> WindowAggregates:
+    """
+    O(locations x months) precomputation; every window query afterwards is O(1).
+    """
+    n_loc, n_month = matrix.shape
+    prefix = {}
+    network_prefix = {}
+    for s in STREAMS:
+        p = np.zeros((n_loc, n_month + 1))
+        np.cumsum(matrix.values[s], axis=1, out=p[:, 1:])
+        prefix[s] = p
+        network_prefix[s] = p.sum(axis=0)
+    year_start = _year_start(matrix)
+    ordinals = np.array([month_ordinal(p) if p is not None else -1 for p in matrix.periods], dtype=np.int64)
+    return WindowAggregates(
+        matrix=matrix,
+        prefix=prefix,
+        network_prefix=network_prefix,
+        year_start=year_start,
+        ordinals=ordinals,
+        starts={w: _window_starts(ordinals, year_start, w) for w in WINDOWS.values()},
+    )
@@ -0,0 +1,43 @@
+import math
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import pandas as pd  # noqa: E402
+
+from kpi_service import build_month_deltas  # noqa: E402
+from location_matrix import build_location_matrix  # noqa: E402
+
+
+def _deltas():
+    # NEW appears in feb_24, GONE is absent from feb_24, ZERO has a $0 base
+    months = {
+        "jan_24": pd.DataFrame({"Location": ["KEEP", "GONE", "ZERO"], "Total": [100.0, 500.0, 0.0]}),
+        "feb_24": pd.DataFrame({"Location": ["KEEP", "NEW", "ZERO"], "Total": [150.0, 900.0, 50.0]}),
+    }
+    return build_month_deltas(build_location_matrix(months))
+
+
+def test_absent_months_get_no_delta():
+    deltas = _deltas()
+    rows = deltas.location_deltas("feb_24").set_index("Location")
+    assert rows.loc["KEEP", "Delta"] == 50.0
+    assert rows.loc["KEEP", "Pct Change"] == 50.0
+    for name in ("NEW", "GONE"):
+        assert math.isnan(rows.loc[name, "Delta"])
+        assert math.isnan(rows.loc[name, "Pct Change"])
+    assert math.isnan(rows.loc["GONE", "Current"])
+    assert math.isnan(rows.loc["NEW", "Previous"])
+
+
+def test_zero_base_has_no_pct_change():
+    rows = _deltas().location_deltas("feb_24").set_index("Location")
+    assert rows.loc["ZERO", "Delta"] == 50.0
+    assert math.isnan(rows.loc["ZERO", "Pct Change"])
+
+
+def test_movers_rank_only_locations_in_both_months():
+    gainers, decliners = _deltas().movers("feb_24")
+    assert gainers["Location"].tolist() == ["KEEP", "ZERO"]
+    assert decliners.empty
@@ -0,0 +1,25 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from reportlab.lib.pagesizes import A4  # noqa: E402
+from reportlab.platypus import Paragraph, SimpleDocTemplate  # noqa: E402
+from reportlab.lib.styles import getSampleStyleSheet  # noqa: E402
+
+from pdf_export import AppendixFeed  # noqa: E402
+
+
+def _build(path, rows):
+    doc = SimpleDocTemplate(str(path), pagesize=A4)
+    doc.build([Paragraph("Appendix", getSampleStyleSheet()["Heading2"]), AppendixFeed(rows)])
+    return doc.page
+
+
+def test_empty_appendix_builds(tmp_path):
+    assert _build(tmp_path / "empty.pdf", []) == 1
+
+
+def test_appendix_spans_pages(tmp_path):
+    rows = ([f"NBIP_{i}", "$1.00", "$0.50", "$0.10", "$0.40", "1.0%"] for i in range(200))
+    assert _build(tmp_path / "rows.pdf", rows) > 1
@@ -0,0 +1,49 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import pandas as pd  # noqa: E402
+
+from kpi_service import build_month_deltas  # noqa: E402
+from location_matrix import build_location_matrix  # noqa: E402
+from query_service import EXAMPLE_QUERIES, build_query_store  # noqa: E402
+from utils import CalendarIndex  # noqa: E402
+
+
+def _store(months):
+    matrix = build_location_matrix({name: pd.DataFrame(rows) for name, rows in months.items()})
+    calendar = CalendarIndex(matrix.months)
+    return build_query_store({"matrix": matrix, "calendar": calendar, "deltas": build_month_deltas(matrix, calendar)})
+
+
+def test_absent_comparison_month_is_null():
+    store = _store({
+        "jan_24": {"Location": ["KEEP", "GONE"], "Total": [100.0, 500.0]},
+        "feb_24": {"Location": ["KEEP", "NEW"], "Total": [150.0, 900.0]},
+        "mar_24": {"Location": ["KEEP", "NEW", "GONE"], "Total": [150.0, 900.0, 400.0]},
+    })
+    rows = store.query(
+        "SELECT location, month, mom_delta, mom_pct, mom_delta IS NULL AND mom_pct IS NULL AS missing "
+        "FROM month_facts WHERE month != 'jan_24'"
+    ).frame
+    got = {(r.location, r.month): r for r in rows.itertuples()}
+    assert (got[("KEEP", "feb_24")].mom_delta, got[("KEEP", "feb_24")].mom_pct) == (50.0, 50.0)
+    assert got[("NEW", "feb_24")].missing == 1   # appears in feb_24
+    assert got[("GONE", "mar_24")].missing == 1  # absent from feb_24
+    assert got[("NEW", "mar_24")].missing == 0
+
+
+def test_growth_streak_needs_consecutive_calendar_months():
+    # Data up 50% every step, but apr_24 is missing: no three-month run
+    store = _store({
+        name: {"Location": ["A"], "Total": [v], "Mobile Data Revenue": [v]}
+        for name, v in [("jan_24", 100.0), ("feb_24", 150.0), ("mar_24", 225.0), ("may_24", 340.0)]
+    })
+    assert store.query(EXAMPLE_QUERIES["Data revenue up >20% three months running"]).frame.empty
+
+    store = _store({
+        name: {"Location": ["A"], "Total": [v], "Mobile Data Revenue": [v]}
+        for name, v in [("jan_24", 100.0), ("feb_24", 150.0), ("mar_24", 225.0), ("apr_24", 340.0)]
+    })
+    assert store.query(EXAMPLE_QUERIES["Data revenue up >20% three months running"]).frame["month"].tolist() == ["apr_24"]
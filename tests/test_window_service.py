@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import pandas as pd  # noqa: E402
+
+from location_matrix import build_location_matrix  # noqa: E402
+from window_service import build_window_aggregates  # noqa: E402
+
+
+def test_trailing_windows_count_calendar_months():
+    # mar_24 and jun_24..dec_24 are missing: windows must not reach back further to make up sheets
+    totals = {"jan_24": 1.0, "feb_24": 2.0, "apr_24": 4.0, "may_24": 5.0, "jan_25": 10.0}
+    windows = build_window_aggregates(build_location_matrix(
+        {name: pd.DataFrame({"Location": ["A"], "Total": [v]}) for name, v in totals.items()}
+    ))
+    assert windows.series(3) == [1.0, 3.0, 6.0, 9.0, 10.0]
+    assert windows.total("jan_25", 12) == 21.0
+    assert windows.ytd("jan_25") == 10.0